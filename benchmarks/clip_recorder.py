@@ -0,0 +1,82 @@
+import argparse
+import tempfile
+import time
+
+import av
+import numpy as np
+
+from surveillance.clip_recorder import ClipRecorder, SoftwareH264Encoder
+from utils.frame_source import EndOfStream, create_source
+
+FPS = 30
+
+
+def count_frames(path):
+    """
+    Decode a raw .h264 clip, returns the number of frames.
+    """
+    with av.open(str(path), format="h264") as container:
+        return sum(1 for _ in container.decode(video=0))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Clip recorder off-device: software H.264 into the ring buffer, events at fixed frames"
+    )
+    parser.add_argument("--source", default="synthetic:900")
+    parser.add_argument("--events", type=int, nargs="+", default=[300, 320, 700])
+    parser.add_argument("--pre-roll", type=float, default=3.0)
+    parser.add_argument("--post-roll", type=float, default=2.0)
+    parser.add_argument("--iperiod", type=int, default=FPS)
+    parser.add_argument("--output-dir", help="Where to keep the clips (default: temporary directory)")
+    args = parser.parse_args()
+
+    output_dir = args.output_dir or tempfile.mkdtemp(prefix="clips_")
+    recorder = ClipRecorder(output_dir, pre_roll=args.pre_roll, post_roll=args.post_roll)
+
+    clips = []
+    add_timings = []
+    buffered = []
+
+    with recorder, create_source(args.source) as source:
+        encoder = None
+        index = 0
+
+        while True:
+            try:
+                frame, _ = source.read()
+            except EndOfStream:
+                break
+
+            if encoder is None:
+                encoder = SoftwareH264Encoder(recorder, frame.shape[1::-1], fps=FPS, iperiod=args.iperiod)
+
+            # Frame timestamps of synthetic sources start at 0 for every run
+            start = time.perf_counter()
+            encoder.encode(frame, index / FPS)
+            add_timings.append(time.perf_counter() - start)
+
+            if index in args.events:
+                path = recorder.trigger()
+                if path:
+                    clips.append((index, path))
+
+            buffered.append(recorder.buffered_seconds)
+            index += 1
+
+        if encoder:
+            encoder.stop()
+
+    encode_ms = np.array(add_timings) * 1000
+    print(f"Encoded {index} frames, encode+buffer mean {encode_ms.mean():.2f} ms, p95 {np.percentile(encode_ms, 95):.2f} ms")
+    print(f"Buffered pre-roll: {min(buffered[FPS * 5:] or buffered):.2f}..{max(buffered):.2f} s")
+
+    for event, path in clips:
+        frames = count_frames(path)
+        print(f"Event at frame {event}: {path} -> {frames} frames ({frames / FPS:.1f} s)")
+
+    print(f"Stats: {recorder.stats}")
+
+
+if __name__ == "__main__":
+    main()
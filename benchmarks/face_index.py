@@ -0,0 +1,94 @@
+import argparse
+import time
+
+import numpy as np
+
+from ml.face.ann import IVFIndex, HNSWIndex, hnswlib
+from ml.face.gallery import FaceGallery, normalize
+
+DIM = 512
+
+
+def synthetic_gallery(size, rng):
+    """
+    Identities as random unit vectors, queries as noisy copies of some of
+    them (a new photo of an enrolled person) plus unrelated strangers.
+    """
+    embeddings = normalize(rng.normal(size=(size, DIM)))
+    return [f"id{i}" for i in range(size)], embeddings
+
+
+def make_queries(embeddings, count, noise, rng):
+    targets = rng.integers(0, len(embeddings), count)
+    queries = embeddings[targets] + rng.normal(scale=noise, size=(count, DIM))
+    return normalize(queries)
+
+
+def measure(gallery, queries, batch):
+    """
+    Returns (best names, mean ms per batch of `batch` faces).
+    """
+    names = []
+    timings = []
+    for start in range(0, len(queries), batch):
+        chunk = queries[start:start + batch]
+        t = time.perf_counter()
+        matches = gallery.match(chunk, threshold=-1.0)
+        timings.append(time.perf_counter() - t)
+        names.extend(name for name, _ in matches)
+    return names, np.mean(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Face gallery search: recall vs latency of exact, IVF and HNSW")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--batch", type=int, default=4, help="Faces per frame")
+    parser.add_argument("--noise", type=float, default=0.03)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--ef", type=int, nargs="+", default=[16, 64])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+
+    if hnswlib is None:
+        print("hnswlib not installed, skipping HNSW")
+
+    for size in args.sizes:
+        names, embeddings = synthetic_gallery(size, rng)
+        queries = make_queries(embeddings, args.queries, args.noise, rng)
+
+        gallery = FaceGallery()
+        for name, embedding in zip(names, embeddings):
+            gallery.add(name, embedding)
+
+        exact, exact_ms = measure(gallery, queries, args.batch)
+        print(f"\n{size} identities, {args.batch} faces per query")
+        print(f"{'exact':>16}: {exact_ms:7.3f} ms | recall 1.000 | build 0.0 s")
+
+        variants = [(f"ivf nprobe={n}", lambda n=n: IVFIndex(nprobe=n)) for n in args.nprobe]
+        if hnswlib is not None:
+            variants += [(f"hnsw ef={ef}", lambda ef=ef: HNSWIndex(ef=ef)) for ef in args.ef]
+
+        for label, make_index in variants:
+            start = time.perf_counter()
+            gallery.set_index(make_index())
+            build = time.perf_counter() - start
+
+            found, ms = measure(gallery, queries, args.batch)
+            recall = np.mean([a == b for a, b in zip(found, exact)])
+            print(f"{label:>16}: {ms:7.3f} ms | recall {recall:.3f} | build {build:.1f} s")
+
+            # Incremental updates, no rebuild
+            start = time.perf_counter()
+            for i in range(100):
+                gallery.add(f"new{i}", embeddings[i])
+                gallery.remove(f"new{i}")
+            update_ms = (time.perf_counter() - start) / 200 * 1000
+            print(f"{'':>16}  add/remove {update_ms:.3f} ms per identity")
+
+        gallery.index = None
+
+
+if __name__ == "__main__":
+    main()
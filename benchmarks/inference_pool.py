@@ -0,0 +1,74 @@
+import argparse
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+from functools import partial
+
+import numpy as np
+
+from utils.inference_pool import ProcessPool, SharedMemoryPool
+
+
+def busy_detector(work_ms):
+    """
+    Stand-in detector: reads the whole frame, spins for work_ms and returns
+    a compact (N, 6) array like a detection result.
+    """
+    def detect(frame):
+        start = time.perf_counter()
+        checksum = float(frame[::4, ::4].mean())
+        while time.perf_counter() - start < work_ms / 1000:
+            pass
+        return np.full((3, 6), checksum, dtype=np.float32)
+    return detect
+
+
+def measure(pool, frames, in_flight):
+    """
+    Keeps `in_flight` frames queued, returns (FPS, mean submit ms).
+    """
+    pending = set()
+    submit_times = []
+    start = time.perf_counter()
+
+    for frame in frames:
+        while len(pending) >= in_flight:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+        t = time.perf_counter()
+        pending.add(pool.submit(frame))
+        submit_times.append(time.perf_counter() - t)
+
+    wait(pending)
+    elapsed = time.perf_counter() - start
+    return len(frames) / elapsed, np.mean(submit_times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Frame transfer to worker processes: pickling vs shared memory")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--work-ms", type=float, default=5.0, help="Simulated inference time")
+    parser.add_argument("--resolutions", nargs="+", default=["640x480", "1280x720", "1920x1080"])
+    args = parser.parse_args()
+
+    factory = partial(busy_detector, args.work_ms)
+
+    for resolution in args.resolutions:
+        w, h = (int(v) for v in resolution.split("x"))
+        rng = np.random.default_rng(0)
+        frames = [rng.integers(0, 255, (h, w, 3), dtype=np.uint8) for _ in range(8)] * (args.frames // 8)
+
+        for name, pool in (
+            ("pickle", ProcessPool(factory, args.workers)),
+            ("shared memory", SharedMemoryPool(factory, args.workers, max_frame_shape=(h, w, 3))),
+        ):
+            with pool:
+                # Spawned workers are ready once they answered a first frame
+                pool.submit(frames[0]).result()
+                fps, submit_ms = measure(pool, frames, 2 * args.workers)
+
+            print(f"{resolution:>9} {name:>13}: {fps:7.1f} FPS | submit {submit_ms:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
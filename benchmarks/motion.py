@@ -0,0 +1,81 @@
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from computer_vision.background import PreviousFrameBackground
+from computer_vision.motion import MotionDetector
+from utils.frame_source import EndOfStream, create_source
+
+MIN_AREA = 1500
+
+# Bottom half of a 640x480 frame, a typical "ignore the sky" mask
+BOTTOM_HALF = [[(0, 240), (640, 240), (640, 480), (0, 480)]]
+
+
+def legacy_detect(state, frame):
+    """
+    Full-resolution chain both motion scripts used before MotionDetector.
+    """
+    gray = cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY)
+    gray = cv2.GaussianBlur(gray, (21, 21), 0)
+
+    if state.get("prev") is None:
+        state["prev"] = gray
+        return []
+
+    delta = cv2.absdiff(state["prev"], gray)
+    thresh = cv2.threshold(delta, 25, 255, cv2.THRESH_BINARY)[1]
+    thresh = cv2.dilate(thresh, None, iterations=2)
+    state["prev"] = gray
+
+    contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    return [cv2.boundingRect(c) for c in contours if cv2.contourArea(c) >= MIN_AREA]
+
+
+def measure(detect, frames):
+    timings = []
+    for frame in frames:
+        start = time.perf_counter()
+        detect(frame)
+        timings.append(time.perf_counter() - start)
+    return np.array(timings[1:]) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-frame cost of motion detection variants")
+    parser.add_argument("--source", default="synthetic")
+    parser.add_argument("--frames", type=int, default=300)
+    args = parser.parse_args()
+
+    frames = []
+    with create_source(args.source) as source:
+        for _ in range(args.frames):
+            try:
+                frames.append(source.capture_array())
+            except EndOfStream:
+                break
+
+    state = {}
+    variants = [("legacy full-res", lambda f: legacy_detect(state, f))]
+
+    for scale in (1.0, 0.5, 0.25):
+        detector = MotionDetector(scale, MIN_AREA, background=PreviousFrameBackground())
+        variants.append((f"scale={scale}", detector.detect))
+
+    detector = MotionDetector(0.25, MIN_AREA, background=PreviousFrameBackground(), roi=BOTTOM_HALF)
+    variants.append(("scale=0.25 + roi", detector.detect))
+
+    baseline = None
+    for name, detect in variants:
+        ms = measure(detect, frames)
+        baseline = baseline or ms.mean()
+        print(
+            f"{name:>18}: mean {ms.mean():6.3f} ms | p95 {np.percentile(ms, 95):6.3f} ms | "
+            f"x{baseline / ms.mean():.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
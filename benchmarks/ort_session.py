@@ -0,0 +1,88 @@
+import argparse
+import json
+import time
+
+import numpy as np
+
+from ml.yolo import config
+from ml.yolo.detect_onnx import YOLODetector
+from ml.yolo.session import optimized_model_path
+from utils.frame_source import SyntheticSource
+
+# One knob changed at a time relative to the config.py defaults
+VARIANTS = [
+    ("baseline", {}, config.USE_IO_BINDING),
+    ("threads=1", {"intra_op_threads": 1}, config.USE_IO_BINDING),
+    ("threads=2", {"intra_op_threads": 2}, config.USE_IO_BINDING),
+    ("threads=3", {"intra_op_threads": 3}, config.USE_IO_BINDING),
+    ("threads=4", {"intra_op_threads": 4}, config.USE_IO_BINDING),
+    ("opt=disable", {"graph_optimization": "disable"}, config.USE_IO_BINDING),
+    ("opt=basic", {"graph_optimization": "basic"}, config.USE_IO_BINDING),
+    ("opt=extended", {"graph_optimization": "extended"}, config.USE_IO_BINDING),
+    ("opt=all", {"graph_optimization": "all"}, config.USE_IO_BINDING),
+    ("mode=parallel", {"execution_mode": "parallel"}, config.USE_IO_BINDING),
+    ("mem_arena=off", {"enable_mem_arena": False}, config.USE_IO_BINDING),
+    ("io_binding=off", {}, False),
+    ("io_binding=on", {}, True),
+]
+
+
+def measure(model_path, options, io_binding, frames, warmup):
+    start = time.perf_counter()
+    detector = YOLODetector(
+        model_path,
+        session_options=options,
+        io_binding=io_binding
+    )
+    startup = time.perf_counter() - start
+
+    for frame in frames[:warmup]:
+        detector.detect(frame)
+
+    timings = []
+    for frame in frames:
+        start = time.perf_counter()
+        detector.detect(frame)
+        timings.append(time.perf_counter() - start)
+
+    ms = np.array(timings) * 1000
+    return {
+        "startup_ms": round(startup * 1000, 1),
+        "mean_ms": round(float(ms.mean()), 2),
+        "p50_ms": round(float(np.percentile(ms, 50)), 2),
+        "p95_ms": round(float(np.percentile(ms, 95)), 2),
+        "fps": round(1000 / float(ms.mean()), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure the effect of each ONNX Runtime session option on YOLODetector"
+    )
+    parser.add_argument("--model", default=str(config.MODEL_PATH))
+    parser.add_argument("--frames", type=int, default=100)
+    parser.add_argument("--warmup", type=int, default=10)
+    args = parser.parse_args()
+
+    with SyntheticSource() as source:
+        frames = [source.capture_array() for _ in range(args.frames)]
+
+    results = {}
+
+    # Cold start without cache vs warm start from the optimized model cache
+    cache_path = optimized_model_path(args.model, config.GRAPH_OPTIMIZATION)
+    cache_path.unlink(missing_ok=True)
+    results["cache=cold"] = measure(args.model, {}, config.USE_IO_BINDING, frames[:1], 0)
+    results["cache=warm"] = measure(args.model, {}, config.USE_IO_BINDING, frames[:1], 0)
+
+    for name, options, io_binding in VARIANTS:
+        # Sweeps measure steady state, keep the cache out of the comparison
+        options = {"cache_optimized_model": False, **options}
+        results[name] = measure(args.model, options, io_binding, frames, args.warmup)
+        print(f"{name:>15}: {results[name]}")
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
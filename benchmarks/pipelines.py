@@ -0,0 +1,69 @@
+import cv2
+
+# Each builder loads its model once and returns a list of (stage_name, fn)
+# pairs. Stages run in order: the first receives the frame, every next one
+# the previous stage's output. Heavy dependencies are imported inside the
+# builders so a run only needs the packages of the pipeline it measures.
+
+
+def build_haar(args):
+    cascade_path = cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
+    face_cascade = cv2.CascadeClassifier(cascade_path)
+
+    if face_cascade.empty():
+        raise RuntimeError("Failed to load Haar Cascade")
+
+    return [
+        ("grayscale", lambda frame: cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY)),
+        ("detect", lambda gray: face_cascade.detectMultiScale(
+            gray,
+            scaleFactor=1.1,
+            minNeighbors=5,
+            minSize=(30, 30)
+        )),
+    ]
+
+
+def build_insightface(args):
+    from ml.face.engine import get_engine
+
+    engine = get_engine()
+
+    # The embed stage needs the frame as well as the landmarks
+    def detect(frame):
+        return frame, engine.detect(frame)[1]
+
+    return [
+        ("detect", detect),
+        ("embed", lambda state: engine.embed(*state) if len(state[1]) else None),
+    ]
+
+
+def build_yolo_onnx(args):
+    from ml.yolo.detect_onnx import YOLODetector
+
+    detector = YOLODetector(model_path=args.yolo_model, conf_threshold=0.5)
+
+    return [
+        ("preprocess", detector.preprocess),
+        ("inference", detector.infer),
+        ("postprocess", detector.postprocess),
+    ]
+
+
+def build_yolo_ncnn(args):
+    from ultralytics import YOLO
+
+    model = YOLO(args.ncnn_model)
+
+    return [
+        ("predict", lambda frame: model(frame, verbose=False)),
+    ]
+
+
+PIPELINES = {
+    "haar": build_haar,
+    "insightface": build_insightface,
+    "yolo_onnx": build_yolo_onnx,
+    "yolo_ncnn": build_yolo_ncnn,
+}
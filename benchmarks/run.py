@@ -0,0 +1,218 @@
+import argparse
+import json
+import multiprocessing
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+from benchmarks.pipelines import PIPELINES
+from utils.frame_source import EndOfStream, create_source
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def latency_summary(seconds):
+    ms = np.asarray(seconds) * 1000
+    return {
+        "mean_ms": round(float(ms.mean()), 3),
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(ms, 95)), 3),
+        "p99_ms": round(float(np.percentile(ms, 99)), 3),
+        "max_ms": round(float(ms.max()), 3),
+    }
+
+
+def load_frames(spec, resolution, count):
+    """
+    Read frames up front so every pipeline sees identical inputs and
+    capture/decoding cost is measured separately.
+    """
+    source = create_source(spec, resolution)
+    frames = []
+    timings = []
+
+    with source:
+        for _ in range(count):
+            start = time.perf_counter()
+            try:
+                frame = source.capture_array()
+            except EndOfStream:
+                break
+            timings.append(time.perf_counter() - start)
+            frames.append(frame)
+
+    if not frames:
+        raise RuntimeError(f"No frames read from {spec}")
+
+    return frames, timings
+
+
+def rss_mb(field):
+    """
+    VmRSS (current) or VmHWM (peak) of this process in MB, None without /proc.
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def reset_peak_rss():
+    # Linux >= 4.0: VmHWM restarts from the current RSS
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def run_isolated(name, args, frames, conn):
+    """
+    Child process body: build and run one pipeline, report its memory as
+    peak RSS over the RSS after the frames were loaded, so neither the
+    frame cache nor earlier pipelines are counted.
+    """
+    reset_peak_rss()
+    baseline = rss_mb("VmRSS")
+
+    stages = PIPELINES[name](args)
+    result = run_pipeline(name, stages, frames, args.warmup)
+
+    peak = rss_mb("VmHWM")
+    result["peak_rss_mb"] = round(peak - baseline, 1) if peak is not None else None
+    conn.send(result)
+    conn.close()
+
+
+def run_pipeline(name, stages, frames, warmup):
+    """
+    Push frames through the stages and collect per-stage latencies,
+    throughput and resource usage.
+    """
+    for frame in frames[:warmup]:
+        data = frame.copy()
+        for _, fn in stages:
+            data = fn(data)
+
+    timings = {stage_name: [] for stage_name, _ in stages}
+    totals = []
+
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+
+    for frame in frames:
+        # Drawing stages may modify the frame in place
+        data = frame.copy()
+        frame_start = time.perf_counter()
+
+        for stage_name, fn in stages:
+            start = time.perf_counter()
+            data = fn(data)
+            timings[stage_name].append(time.perf_counter() - start)
+
+        totals.append(time.perf_counter() - frame_start)
+
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+
+    return {
+        "pipeline": name,
+        "frames": len(frames),
+        "fps": round(len(frames) / wall, 2),
+        "cpu_percent": round(cpu / wall * 100, 1),
+        "stages": {
+            stage_name: latency_summary(values)
+            for stage_name, values in timings.items()
+        },
+        "total": latency_summary(totals),
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Replay frames through vision pipelines and report FPS, latency and resources as JSON"
+    )
+    parser.add_argument(
+        "pipelines",
+        nargs="+",
+        choices=sorted(PIPELINES),
+        help="Pipelines to benchmark on identical inputs"
+    )
+    parser.add_argument(
+        "--source",
+        default="synthetic",
+        help="video:<path>, images:<dir>, synthetic or picamera"
+    )
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument("--yolo-model", default="ml/yolo/models/yolov8n.onnx")
+    parser.add_argument("--ncnn-model", default="ml/yolo26n/models/yolo26n_ncnn_model")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    resolution = (args.width, args.height)
+
+    frames, capture_timings = load_frames(args.source, resolution, args.frames)
+
+    report = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "source": args.source,
+        "resolution": list(resolution),
+        "capture": latency_summary(capture_timings),
+        "results": [],
+    }
+
+    # Each pipeline runs in a forked child that inherits the loaded frames,
+    # models and allocations of one pipeline can't inflate the next one
+    context = multiprocessing.get_context("fork")
+
+    for name in args.pipelines:
+        print(f"Running {name}...", file=sys.stderr)
+        receiver, sender = context.Pipe(duplex=False)
+        process = context.Process(target=run_isolated, args=(name, args, frames, sender))
+        process.start()
+        sender.close()
+
+        try:
+            result = receiver.recv()
+        except EOFError:
+            process.join()
+            raise RuntimeError(f"Pipeline {name} failed (exit code {process.exitcode})")
+        process.join()
+
+        report["results"].append(result)
+
+    text = json.dumps(report, indent=2)
+    print(text)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
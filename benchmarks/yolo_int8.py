@@ -0,0 +1,123 @@
+import argparse
+import json
+import time
+
+import numpy as np
+
+from ml.yolo import config
+from ml.yolo.detect_onnx import YOLODetector
+from utils.boxes import box_iou
+from utils.frame_source import EndOfStream, create_source
+
+
+def match_detections(reference, candidate, iou_threshold):
+    """
+    Greedily match candidate detections to reference ones of the same class.
+    Returns (number of matches, IoU per match, abs score difference per match).
+    """
+    if len(reference) == 0 or len(candidate) == 0:
+        return 0, [], []
+
+    iou = box_iou(reference.boxes, candidate.boxes)
+    iou[reference.class_ids[:, None] != candidate.class_ids[None, :]] = 0
+
+    matches = 0
+    ious = []
+    score_diffs = []
+
+    # Highest IoU pairs first, each detection used at most once
+    for flat in np.argsort(-iou, axis=None):
+        i, j = np.unravel_index(flat, iou.shape)
+        if iou[i, j] < iou_threshold:
+            break
+        if np.isnan(iou[i, j]):
+            continue
+
+        matches += 1
+        ious.append(float(iou[i, j]))
+        score_diffs.append(abs(float(reference.scores[i] - candidate.scores[j])))
+        iou[i, :] = np.nan
+        iou[:, j] = np.nan
+
+    return matches, ious, score_diffs
+
+
+def run(detector, frames):
+    results = []
+    timings = []
+
+    for frame in frames:
+        start = time.perf_counter()
+        results.append(detector.detect(frame))
+        timings.append(time.perf_counter() - start)
+
+    return results, np.array(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Accuracy vs speed of the INT8 model, using FP32 detections as reference"
+    )
+    parser.add_argument("--fp32-model", default=str(config.MODEL_PATH))
+    parser.add_argument("--int8-model", default=str(config.INT8_MODEL_PATH))
+    parser.add_argument("--source", default=f"images:{config.CALIBRATION_DIR}")
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--iou", type=float, default=0.5)
+    args = parser.parse_args()
+
+    frames = []
+    with create_source(args.source) as source:
+        for _ in range(args.frames):
+            try:
+                frames.append(source.capture_array())
+            except EndOfStream:
+                break
+
+    fp32 = YOLODetector(args.fp32_model)
+    int8 = YOLODetector(args.int8_model)
+
+    # Warm up both sessions before timing
+    for frame in frames[:5]:
+        fp32.detect(frame)
+        int8.detect(frame)
+
+    fp32_results, fp32_ms = run(fp32, frames)
+    int8_results, int8_ms = run(int8, frames)
+
+    total_fp32 = sum(len(r) for r in fp32_results)
+    total_int8 = sum(len(r) for r in int8_results)
+    total_matches = 0
+    all_ious = []
+    all_score_diffs = []
+
+    for reference, candidate in zip(fp32_results, int8_results):
+        matches, ious, score_diffs = match_detections(reference, candidate, args.iou)
+        total_matches += matches
+        all_ious += ious
+        all_score_diffs += score_diffs
+
+    report = {
+        "frames": len(frames),
+        "fp32": {
+            "mean_ms": round(float(fp32_ms.mean()), 2),
+            "p95_ms": round(float(np.percentile(fp32_ms, 95)), 2),
+            "detections": total_fp32,
+        },
+        "int8": {
+            "mean_ms": round(float(int8_ms.mean()), 2),
+            "p95_ms": round(float(np.percentile(int8_ms, 95)), 2),
+            "detections": total_int8,
+        },
+        "speedup": round(float(fp32_ms.mean() / int8_ms.mean()), 2),
+        # INT8 agreement with FP32 treated as ground truth
+        "recall": round(total_matches / total_fp32, 3) if total_fp32 else None,
+        "precision": round(total_matches / total_int8, 3) if total_int8 else None,
+        "mean_iou": round(float(np.mean(all_ious)), 3) if all_ious else None,
+        "mean_score_diff": round(float(np.mean(all_score_diffs)), 3) if all_score_diffs else None,
+    }
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
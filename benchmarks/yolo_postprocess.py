@@ -0,0 +1,131 @@
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from ml.yolo.detect_onnx import decode_predictions
+
+IMG_SIZE = 640
+FRAME_SHAPE = (480, 640, 3)
+CONF_THRESHOLD = 0.5
+NMS_THRESHOLD = 0.4
+
+
+def legacy_postprocess(predictions, frame_shape, img_size, conf_threshold, nms_threshold):
+    """
+    Per-row Python loop used by YOLODetector.postprocess before vectorization.
+    Kept here as the reference implementation for comparison.
+    """
+    predictions = np.transpose(predictions)
+    h, w = frame_shape[:2]
+
+    boxes = []
+    confidences = []
+    class_ids = []
+
+    for pred in predictions:
+        scores = pred[4:]
+        class_id = np.argmax(scores)
+        confidence = scores[class_id]
+
+        if confidence > conf_threshold:
+            x, y, width, height = pred[0:4]
+
+            x1 = int((x - width / 2) * w / img_size)
+            y1 = int((y - height / 2) * h / img_size)
+            x2 = int((x + width / 2) * w / img_size)
+            y2 = int((y + height / 2) * h / img_size)
+
+            boxes.append([x1, y1, x2 - x1, y2 - y1])
+            confidences.append(float(confidence))
+            class_ids.append(class_id)
+
+    indices = cv2.dnn.NMSBoxes(boxes, confidences, conf_threshold, nms_threshold)
+    return np.asarray(indices).flatten()
+
+
+def synthetic_outputs(count, num_classes=80, objects=10, seed=0):
+    """
+    Generate YOLOv8-shaped outputs (count, 4 + num_classes, 8400) with a few
+    clusters of confident candidates around random objects.
+    """
+    rng = np.random.default_rng(seed)
+    outputs = np.empty((count, 4 + num_classes, 8400), dtype=np.float32)
+
+    for i in range(count):
+        outputs[i, 0:2] = rng.uniform(0, IMG_SIZE, (2, 8400))
+        outputs[i, 2:4] = rng.uniform(10, 200, (2, 8400))
+        outputs[i, 4:] = rng.uniform(0, 0.3, (num_classes, 8400))
+
+        # Every object gets a cluster of overlapping confident candidates
+        for _ in range(objects):
+            cols = rng.choice(8400, 20, replace=False)
+            center = rng.uniform(100, 540, 2)
+            size = rng.uniform(40, 200, 2)
+            outputs[i, 0:2, cols] = (center + rng.normal(0, 4, (20, 2)))
+            outputs[i, 2:4, cols] = (size + rng.normal(0, 4, (20, 2)))
+            outputs[i, 4 + rng.integers(num_classes), cols] = rng.uniform(0.55, 0.95, 20)
+
+    return outputs
+
+
+def vectorized_postprocess(predictions):
+    return decode_predictions(predictions, CONF_THRESHOLD, NMS_THRESHOLD)[0]
+
+
+def loop_postprocess(predictions):
+    return legacy_postprocess(
+        predictions, FRAME_SHAPE, IMG_SIZE, CONF_THRESHOLD, NMS_THRESHOLD
+    )
+
+
+def time_per_call(fn, outputs, repeat):
+    timings = []
+    for _ in range(repeat):
+        for predictions in outputs:
+            start = time.perf_counter()
+            fn(predictions)
+            timings.append(time.perf_counter() - start)
+    return np.array(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare loop vs vectorized YOLOv8 postprocessing"
+    )
+    parser.add_argument(
+        "--outputs",
+        help="Recorded raw model outputs (.npy), shape (N, 84, 8400) or (N, 1, 84, 8400)"
+    )
+    parser.add_argument("--frames", type=int, default=50, help="Synthetic frames if no recording")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.outputs:
+        outputs = np.load(args.outputs).astype(np.float32)
+        outputs = outputs.reshape(-1, outputs.shape[-2], outputs.shape[-1])
+    else:
+        outputs = synthetic_outputs(args.frames)
+
+    print(f"Frames: {len(outputs)}, candidates per frame: {outputs.shape[-1]}")
+
+    for name, fn in (
+        ("loop", loop_postprocess),
+        ("vectorized", vectorized_postprocess),
+    ):
+        ms = time_per_call(fn, outputs, args.repeat)
+        print(
+            f"{name:>10}: mean {ms.mean():7.3f} ms | "
+            f"p50 {np.percentile(ms, 50):7.3f} ms | "
+            f"p95 {np.percentile(ms, 95):7.3f} ms"
+        )
+
+    # Sanity check: both paths should keep a similar number of boxes
+    legacy_count = sum(len(loop_postprocess(p)) for p in outputs)
+    vectorized_count = sum(len(vectorized_postprocess(p)) for p in outputs)
+    print(f"Detections kept: loop={legacy_count}, vectorized={vectorized_count}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import cv2
+import numpy as np
+
+
+class StaticBackground:
+    """
+    Background captured once from the first frame and never updated.
+    """
+
+    def __init__(self, threshold: int = 25):
+        self.threshold = threshold
+        self.background = None
+        self._delta = None
+        self._mask = None
+
+    def apply(self, gray):
+        """
+        Compare a blurred grayscale frame against the background.
+        Returns a binary foreground mask (0/255).
+        """
+        if self.background is None or self.background.shape != gray.shape:
+            self.background = gray.copy()
+            self._delta = np.empty_like(gray)
+            self._mask = np.zeros_like(gray)
+            return self._mask
+
+        cv2.absdiff(self.background, gray, dst=self._delta)
+        cv2.threshold(self._delta, self.threshold, 255, cv2.THRESH_BINARY, dst=self._mask)
+        return self._mask
+
+
+class PreviousFrameBackground(StaticBackground):
+    """
+    Frame differencing: every frame is compared against the previous one.
+    """
+
+    def apply(self, gray):
+        mask = super().apply(gray)
+        self.background[...] = gray
+        return mask
+
+
+class RunningAverageBackground(StaticBackground):
+    """
+    Exponentially weighted running average background:
+        background = (1 - alpha) * background + alpha * frame
+    updated in place with cv2.accumulateWeighted, so slow lighting changes
+    are absorbed while moving objects still stand out.
+    """
+
+    def __init__(self, alpha: float = 0.05, threshold: int = 25):
+        super().__init__(threshold)
+        self.alpha = alpha
+        self._average = None
+
+    def apply(self, gray):
+        if self._average is None or self._average.shape != gray.shape:
+            self._average = gray.astype(np.float32)
+            return super().apply(gray)
+
+        cv2.convertScaleAbs(self._average, dst=self.background)
+        mask = super().apply(gray)
+        cv2.accumulateWeighted(gray, self._average, self.alpha)
+        return mask
+
+
+class MOG2Background:
+    """
+    OpenCV Gaussian mixture background subtractor with per-pixel statistics.
+    Shadows (marked 127 by MOG2) are dropped from the foreground mask.
+    """
+
+    def __init__(self, history: int = 500, var_threshold: float = 16, detect_shadows: bool = True):
+        self.subtractor = cv2.createBackgroundSubtractorMOG2(
+            history=history,
+            varThreshold=var_threshold,
+            detectShadows=detect_shadows
+        )
+        self._mask = None
+
+    def apply(self, gray):
+        fg = self.subtractor.apply(gray)
+
+        if self._mask is None or self._mask.shape != fg.shape:
+            self._mask = np.empty_like(fg)
+
+        cv2.threshold(fg, 200, 255, cv2.THRESH_BINARY, dst=self._mask)
+        return self._mask
+
+
+def create_background_model(name: str, **options):
+    """
+    Build a background model by name:
+    static, previous_frame, running_average or mog2.
+    """
+    models = {
+        "static": StaticBackground,
+        "previous_frame": PreviousFrameBackground,
+        "running_average": RunningAverageBackground,
+        "mog2": MOG2Background,
+    }
+
+    if name not in models:
+        raise ValueError(f"Unknown background model: {name}")
+
+    return models[name](**options)
@@ -1,27 +1,20 @@
-from picamera2 import Picamera2
 import logging
-from libcamera import Transform
 from pathlib import Path
 import cv2
-import time
+from utils import metrics
 from utils.logger import setup_logging
+from utils.camera import CameraManager
+
+RESOLUTION = (640, 480)
+
+# Faces are searched on the Y plane of this lores stream
+LORES_RESOLUTION = (320, 240)
 
 def main():
     # Logger initialization
     logs_dir = Path("logs")
     setup_logging(logs_dir / "face_detection.log")
 
-    # Camera configuration
-    camera = Picamera2()
-    config = camera.create_preview_configuration(
-        main={
-            "format": "RGB888", 
-            "size": (640, 480)},
-        transform=Transform(hflip=1, vflip=1)
-    )
-    camera.configure(config)
-    camera.start()
-
     # Load pre-trained Haar Cascade classifier for face detection
     cascade_path = cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
     face_cascade = cv2.CascadeClassifier(cascade_path)
@@ -33,62 +26,75 @@ def main():
     cv2.namedWindow("Face Detection", cv2.WINDOW_NORMAL)
     logging.info("Face detection started. Press ESC to exit.")
 
-    prev_time = time.time()
     face_present = False
 
-    while True:
-        # Capture a new frame from the camera as an RGB array
-        frame = camera.capture_array()
-
-        # Convert the frame to grayscale, as the face detector requires it
-        gray = cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY)
-
-        # Detect faces in the grayscale image
-        # scaleFactor: how much the image size is reduced at each image scale
-        # minNeighbors: how many neighbors each candidate rectangle should have to retain it
-        faces = face_cascade.detectMultiScale(
-            gray,
-            scaleFactor=1.1,
-            minNeighbors=5,
-            minSize=(30,30)
-        )
-
-        current_face_state = len(faces) > 0
-
-        if current_face_state and not face_present:
-            logging.info("Face detected")
-
-        if not current_face_state and face_present:
-            logging.info("Face lost")
-
-        face_present = current_face_state
-
-        # Draw a rectangle around every detected face
-        for (x, y, w, h) in faces:
-            cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
-        
-        # Calculate Frames Per Second (FPS)
-        current_time = time.time()
-        fps = 1 / (current_time - prev_time)
-        prev_time = current_time
-
-        # Display the FPS counter on the frame
-        cv2.putText(
-            frame,
-            f"FPS: {int(fps)}",
-            (10, 20),
-            cv2.FONT_HERSHEY_SIMPLEX,
-            0.6,
-            (0, 255, 0),
-            2
-        )
-
-        cv2.imshow("Face Detection", frame)
-
-        if cv2.waitKey(1) == 27: # the 'ESC' key
-            break
-    
-    camera.stop()
+    # Per-stage latency histograms and output FPS, summarised in the log
+    capture_timer = metrics.stage_timer("capture")
+    inference_timer = metrics.stage_timer("inference")
+    draw_timer = metrics.stage_timer("draw")
+    frame_rate = metrics.FrameRate("face_detection")
+
+    # lores -> main coordinates
+    sx = RESOLUTION[0] / LORES_RESOLUTION[0]
+    sy = RESOLUTION[1] / LORES_RESOLUTION[1]
+
+    with metrics.Reporter(), CameraManager(resolution=RESOLUTION, lores=LORES_RESOLUTION) as camera:
+        while True:
+            # Capture a new frame: the lores Y plane is already grayscale,
+            # so no RGB -> gray conversion is needed for the detector
+            with capture_timer.time():
+                dual = camera.capture_dual()
+
+            # Detect faces in the grayscale image
+            # scaleFactor: how much the image size is reduced at each image scale
+            # minNeighbors: how many neighbors each candidate rectangle should have to retain it
+            with inference_timer.time():
+                faces = face_cascade.detectMultiScale(
+                    dual.analysis,
+                    scaleFactor=1.1,
+                    minNeighbors=5,
+                    minSize=(15,15)
+                )
+
+            # Full-resolution frame for display, then return the camera buffers
+            frame = dual.main()
+            dual.release()
+
+            current_face_state = len(faces) > 0
+
+            if current_face_state and not face_present:
+                logging.info("Face detected")
+
+            if not current_face_state and face_present:
+                logging.info("Face lost")
+
+            face_present = current_face_state
+
+            # Frames Per Second (FPS) averaged over the last 30 frames
+            fps = frame_rate.tick()
+
+            with draw_timer.time():
+                # Draw a rectangle around every detected face
+                for (x, y, w, h) in faces:
+                    x, y, w, h = int(x * sx), int(y * sy), int(w * sx), int(h * sy)
+                    cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
+
+                # Display the FPS counter on the frame
+                cv2.putText(
+                    frame,
+                    f"FPS: {int(fps)}",
+                    (10, 20),
+                    cv2.FONT_HERSHEY_SIMPLEX,
+                    0.6,
+                    (0, 255, 0),
+                    2
+                )
+
+            cv2.imshow("Face Detection", frame)
+
+            if cv2.waitKey(1) == 27: # the 'ESC' key
+                break
+
     cv2.destroyAllWindows()
 
 if __name__ == "__main__":
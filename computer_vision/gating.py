@@ -0,0 +1,128 @@
+import logging
+import time
+
+
+class MotionGate:
+    """
+    Cascade gating: cheap motion detection decides when an expensive
+    detector (YOLO, InsightFace) runs at all.
+
+    - a frame with motion opens the gate for `hold_off` seconds, so objects
+      that stop moving are still detected for a while
+    - while the gate is closed the detector is skipped and `empty()` is
+      returned instead
+    - with crop=True only the padded union of the motion boxes is passed to
+      the detector and the results are shifted back with `offset()`; crop
+      sides are rounded up to multiples of `crop_step`, so the detector's
+      preprocessing sees a handful of shapes and keeps its buffers
+    """
+
+    def __init__(
+        self,
+        motion,
+        hold_off: float = 2.0,
+        crop: bool = False,
+        padding: float = 0.25,
+        min_crop_size: int = 160,
+        crop_step: int = 128
+    ):
+        self.motion = motion
+        self.hold_off = hold_off
+        self.crop = crop
+        self.padding = padding
+        self.min_crop_size = min_crop_size
+        self.crop_step = crop_step
+
+        self._last_motion = None
+        self._region = None
+
+        self.stats = {
+            "frames": 0,
+            "motion_frames": 0,
+            "inferences": 0,
+            "cropped": 0,
+            "avoided": 0,
+        }
+
+    def _snap(self, start, end, limit):
+        """
+        Grow [start, end) around its center to the next multiple of
+        crop_step (at least min_crop_size), shifted to stay inside [0, limit).
+        """
+        step = self.crop_step
+        size = max(end - start, self.min_crop_size)
+        size = min(-(-size // step) * step, limit)
+
+        start = int((start + end - size) / 2)
+        start = min(max(start, 0), limit - size)
+        return start, start + size
+
+    def _union(self, boxes, frame_shape):
+        """
+        Padded bounding box of all motion boxes in one of the snapped sizes,
+        inside the frame.
+        """
+        h, w = frame_shape[:2]
+        x1 = min(x for x, _, _, _ in boxes)
+        y1 = min(y for _, y, _, _ in boxes)
+        x2 = max(x + bw for x, _, bw, _ in boxes)
+        y2 = max(y + bh for _, y, _, bh in boxes)
+
+        pad_x = (x2 - x1) * self.padding
+        pad_y = (y2 - y1) * self.padding
+
+        x1, x2 = self._snap(int(x1 - pad_x), int(x2 + pad_x), w)
+        y1, y2 = self._snap(int(y1 - pad_y), int(y2 + pad_y), h)
+        return x1, y1, x2, y2
+
+    def update(self, frame):
+        """
+        Feed one frame to the motion detector.
+        Returns None when the detector should be skipped, otherwise the
+        (x1, y1, x2, y2) region it should look at.
+        """
+        now = time.monotonic()
+        self.stats["frames"] += 1
+
+        boxes = self.motion.detect(frame)
+        if boxes:
+            self.stats["motion_frames"] += 1
+            self._last_motion = now
+
+            h, w = frame.shape[:2]
+            self._region = self._union(boxes, frame.shape) if self.crop else (0, 0, w, h)
+
+        if self._last_motion is None or now - self._last_motion > self.hold_off:
+            self.stats["avoided"] += 1
+            return None
+
+        self.stats["inferences"] += 1
+        return self._region
+
+    def wrap(self, detect, empty, offset=None):
+        """
+        Gated version of detect(frame) for a Pipeline process stage.
+        offset(result, dx, dy) maps results of a cropped region back to
+        frame coordinates, needed with crop=True.
+        """
+        def process(frame):
+            region = self.update(frame)
+            if region is None:
+                return empty()
+
+            x1, y1, x2, y2 = region
+            h, w = frame.shape[:2]
+            if (x1, y1, x2, y2) == (0, 0, w, h) or offset is None:
+                return detect(frame)
+
+            self.stats["cropped"] += 1
+            return offset(detect(frame[y1:y2, x1:x2]), x1, y1)
+
+        return process
+
+    def summary(self):
+        frames = max(self.stats["frames"], 1)
+        return {**self.stats, "avoided_pct": round(100 * self.stats["avoided"] / frames, 1)}
+
+    def log_stats(self):
+        logging.info(f"Motion gate: {self.summary()}")
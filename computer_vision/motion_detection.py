@@ -1,10 +1,13 @@
-from picamera2 import Picamera2
-from libcamera import Transform
 from pathlib import Path
 import cv2
 import time
 import logging
+from utils import metrics
 from utils.logger import setup_logging
+from utils.camera import CameraManager
+from utils.event_writer import EventWriter
+from computer_vision.background import PreviousFrameBackground
+from computer_vision.motion import MotionDetector
 
 def main():
     # Logger initialization
@@ -15,83 +18,59 @@ def main():
     storage_dir = Path("storage/motion")
     storage_dir.mkdir(parents=True, exist_ok=True)
 
-    # Camera configuration
-    camera = Picamera2()
-    config = camera.create_preview_configuration(
-        main={
-            "format": "RGB888", 
-            "size": (640, 480)},
-        transform=Transform(hflip=1, vflip=1)
+    # Compare every frame with the previous one on the 320x240 lores
+    # Y plane, downscaled once more to 160x120; boxes come back in
+    # main stream pixels
+    motion = MotionDetector(
+        scale=0.5,
+        min_area=500,
+        background=PreviousFrameBackground(),
+        output_size=(640, 480)
     )
-    camera.configure(config)
-    camera.start()
 
     cv2.namedWindow("Motion Detection", cv2.WINDOW_NORMAL)
     logging.info("Motion detection started. Press ESC to exit.")
 
-    prev_frame = None
     last_saved_time = 0
 
-    while True:
-        # Capture the current frame from the camera as an array
-        frame = camera.capture_array()
-
-        # Convert the frame to black and white for easier processing 
-        gray = cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY)
-
-        # # Apply Gaussian Blur to reduce noise and improve accuracy
-        gray = cv2.GaussianBlur(gray, (21, 21), 0)
-
-        # Save the previous version of the frame as "prev_frame"
-        if prev_frame is None:
-            prev_frame = gray
-            continue
-
-        # Compute the absolute difference between the current frame and the previous one
-        frame_delta = cv2.absdiff(prev_frame, gray)
-        
-        # Apply a threshold to highlight significant changes (pixels > 25 become 255/white)
-        thresh = cv2.threshold(frame_delta, 25, 255, cv2.THRESH_BINARY)[1]
-
-        # Dilate the thresholded image to fill in holes and join nearby regions
-        thresh = cv2.dilate(thresh, None, iterations=2)
-
-        # Find contours (outlines) of the moving objects
-        contours, _ = cv2.findContours(
-            thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE
-        )
-
-        motion_detected = False
-        
-        # Iterate through detected contours
-        for contour in contours:
-            if cv2.contourArea(contour) < 500:
-                continue
-
-            motion_detected = True
-            (x, y, w, h) = cv2.boundingRect(contour)
-            cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
-
-        if motion_detected:
-            current_time = time.time()
-
-            # Save the frame only if the 2-second cooldown period has passed
-            if current_time - last_saved_time > 2:
-                filename = storage_dir / f"motion_{int(current_time)}.jpg"
-            
-                cv2.imwrite(str(filename), frame)
-            
-            
-                logging.info(f"Motion detected! Saved: {filename}")
-                last_saved_time = current_time
-        cv2.imshow("Motion Detection", frame)
-
-        prev_frame = gray
-
-        if cv2.waitKey(1) == 27: # the 'ESC' key
-            break
-
-    camera.stop()
+    capture_timer = metrics.stage_timer("capture")
+    inference_timer = metrics.stage_timer("inference")
+    draw_timer = metrics.stage_timer("draw")
+
+    # JPEG encoding and disk writes happen off the capture loop
+    writer = EventWriter()
+
+    with writer, metrics.Reporter(), CameraManager(resolution=(640, 480), lores=(320, 240)) as camera:
+        while True:
+            # Capture the current frame: grayscale lores plane for analysis
+            # and the full-resolution image for display
+            with capture_timer.time():
+                dual = camera.capture_dual()
+            with dual:
+                with inference_timer.time():
+                    boxes = motion.detect(dual.analysis)
+                frame = dual.main()
+
+            with draw_timer.time():
+                for (x, y, w, h) in boxes:
+                    cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
+
+            if boxes:
+                current_time = time.time()
+
+                # Save the frame only if the 2-second cooldown period has passed
+                if current_time - last_saved_time > 2:
+                    filename = storage_dir / f"motion_{int(current_time)}.jpg"
+
+                    if writer.submit(filename, frame):
+                        logging.info(f"Motion detected! Saved: {filename}")
+                    last_saved_time = current_time
+
+            cv2.imshow("Motion Detection", frame)
+
+            if cv2.waitKey(1) == 27: # the 'ESC' key
+                break
+
     cv2.destroyAllWindows()
 
 
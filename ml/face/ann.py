@@ -0,0 +1,244 @@
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+try:
+    import hnswlib
+except ImportError:
+    hnswlib = None
+
+
+def kmeans(vectors, k: int, iterations: int = 10, sample: int = 20000, seed: int = 0):
+    """
+    Spherical k-means on unit vectors, returns (k, D) unit-length centroids.
+    Trains on a random sample so building stays cheap for large galleries.
+    """
+    rng = np.random.default_rng(seed)
+    if len(vectors) > sample:
+        vectors = vectors[np.sort(rng.choice(len(vectors), sample, replace=False))]
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+
+    centroids = vectors[rng.choice(len(vectors), k, replace=False)].copy()
+
+    for _ in range(iterations):
+        assignment = (vectors @ centroids.T).argmax(axis=1)
+
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, vectors)
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+
+        # Empty clusters keep their previous centroid
+        filled = norms[:, 0] > 0
+        centroids[filled] = sums[filled] / norms[filled]
+
+    return centroids
+
+
+class IVFIndex:
+    """
+    Inverted file index in plain numpy: identities are grouped under their
+    nearest k-means centroid and a query only scores the `nprobe` closest
+    groups. Rows are added and removed incrementally; the centroids are
+    retrained once the gallery outgrows what they were trained on.
+    save()/load() keep the centroids and lists next to the gallery file.
+    """
+
+    suffix = ".ivf"
+
+    def __init__(self, nlist: int = None, nprobe: int = 8, iterations: int = 10, seed: int = 0):
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.iterations = iterations
+        self.seed = seed
+
+        self.centroids = None
+        self.trained_size = 0
+        self._lists = []
+        self._arrays = []
+        self._where = {}
+
+    def build(self, vectors):
+        n = len(vectors)
+        self._where = {}
+        self.trained_size = n
+
+        if n == 0:
+            self.centroids = None
+            self._lists = []
+            self._arrays = []
+            return
+
+        # sqrt(N) lists is the usual balance of probe vs scan cost
+        nlist = min(self.nlist or max(1, int(np.sqrt(n))), n)
+        self.centroids = kmeans(vectors, nlist, self.iterations, seed=self.seed)
+
+        assignment = self._assign(vectors)
+        self._lists = [[] for _ in range(nlist)]
+        for row, list_id in enumerate(assignment.tolist()):
+            self._lists[list_id].append(row)
+            self._where[row] = list_id
+        self._arrays = [None] * nlist
+
+    def stale(self, size: int) -> bool:
+        return size > 4 * max(self.trained_size, 64)
+
+    def _assign(self, vectors):
+        return (vectors @ self.centroids.T).argmax(axis=1)
+
+    def add(self, row: int, vector):
+        if self.centroids is None:
+            # First identity of an empty gallery becomes the only centroid
+            self.centroids = np.array(vector[None], dtype=np.float32)
+            self._lists = [[]]
+            self._arrays = [None]
+            self.trained_size = 1
+
+        list_id = int(self._assign(vector[None])[0])
+        self._lists[list_id].append(row)
+        self._arrays[list_id] = None
+        self._where[row] = list_id
+
+    def remove(self, row: int):
+        list_id = self._where.pop(row)
+        self._lists[list_id].remove(row)
+        self._arrays[list_id] = None
+
+    def _rows(self, list_id):
+        # Row arrays are rebuilt lazily after a list changes
+        if self._arrays[list_id] is None:
+            self._arrays[list_id] = np.array(self._lists[list_id], dtype=np.int64)
+        return self._arrays[list_id]
+
+    def save(self, path):
+        rows = np.array(sorted(self._where), dtype=np.int64)
+        centroids = self.centroids if self.centroids is not None else np.empty((0, 0), dtype=np.float32)
+
+        path = Path(path)
+        with tempfile.NamedTemporaryFile(dir=path.parent, prefix=path.name, suffix=".tmp", delete=False) as f:
+            np.savez(
+                f,
+                centroids=centroids,
+                rows=rows,
+                lists=np.array([self._where[row] for row in rows.tolist()], dtype=np.int64),
+                trained_size=self.trained_size
+            )
+        os.replace(f.name, path)
+
+    def load(self, path, dim: int):
+        with np.load(path) as data:
+            centroids = data["centroids"]
+            rows, lists = data["rows"], data["lists"]
+            self.trained_size = int(data["trained_size"])
+
+        self.centroids = centroids if len(centroids) else None
+        self._lists = [[] for _ in range(len(centroids))]
+        self._arrays = [None] * len(centroids)
+        self._where = {}
+        for row, list_id in zip(rows.tolist(), lists.tolist()):
+            self._lists[list_id].append(row)
+            self._where[row] = list_id
+
+    def search(self, queries, vectors):
+        """
+        Best row and its similarity for each unit-length query.
+        Rows are -1 when the probed lists are empty.
+        """
+        rows = np.full(len(queries), -1, dtype=np.int64)
+        scores = np.full(len(queries), -1.0, dtype=np.float32)
+
+        if self.centroids is None:
+            return rows, scores
+
+        nprobe = min(self.nprobe, len(self.centroids))
+        closeness = queries @ self.centroids.T
+        probes = np.argpartition(-closeness, nprobe - 1, axis=1)[:, :nprobe]
+
+        for i, query in enumerate(queries):
+            candidates = np.concatenate([self._rows(c) for c in probes[i]])
+            if not len(candidates):
+                continue
+
+            similarities = vectors[candidates] @ query
+            best = similarities.argmax()
+            rows[i] = candidates[best]
+            scores[i] = similarities[best]
+
+        return rows, scores
+
+
+class HNSWIndex:
+    """
+    HNSW graph from the optional hnswlib package, inner product on unit
+    vectors equals cosine similarity. Removed rows are only marked deleted.
+    save()/load() use hnswlib's own index file.
+    """
+
+    suffix = ".hnsw"
+
+    def __init__(self, m: int = 16, ef_construction: int = 200, ef: int = 64):
+        if hnswlib is None:
+            raise ImportError("hnswlib is not installed, use the ivf index or pip install hnswlib")
+
+        self.m = m
+        self.ef_construction = ef_construction
+        self.ef = ef
+        self._index = None
+
+    def build(self, vectors):
+        self._index = hnswlib.Index(space="ip", dim=vectors.shape[1])
+        self._index.init_index(
+            max_elements=max(len(vectors), 1024),
+            ef_construction=self.ef_construction,
+            M=self.m
+        )
+        if len(vectors):
+            self._index.add_items(vectors, np.arange(len(vectors)))
+        self._index.set_ef(self.ef)
+
+    def stale(self, size: int) -> bool:
+        return False
+
+    def add(self, row: int, vector):
+        capacity = self._index.get_max_elements()
+        if self._index.get_current_count() >= capacity:
+            self._index.resize_index(capacity * 2)
+
+        # Re-adding a deleted label overwrites and undeletes it
+        self._index.add_items(vector[None], [row])
+
+    def remove(self, row: int):
+        self._index.mark_deleted(row)
+
+    def save(self, path):
+        # hnswlib writes by file name, the temporary file only reserves one
+        path = Path(path)
+        with tempfile.NamedTemporaryFile(dir=path.parent, prefix=path.name, suffix=".tmp", delete=False) as f:
+            pass
+        self._index.save_index(f.name)
+        os.replace(f.name, path)
+
+    def load(self, path, dim: int):
+        self._index = hnswlib.Index(space="ip", dim=dim)
+        self._index.load_index(str(path))
+        self._index.set_ef(self.ef)
+
+    def search(self, queries, vectors):
+        labels, distances = self._index.knn_query(queries, k=1)
+        # "ip" distance is 1 - inner product
+        return labels[:, 0].astype(np.int64), 1.0 - distances[:, 0]
+
+
+def create_index(name: str, **options):
+    """
+    Build a gallery index by name: exact (None, plain matmul), ivf or hnsw.
+    """
+    if name == "exact":
+        return None
+    if name == "ivf":
+        return IVFIndex(**options)
+    if name == "hnsw":
+        return HNSWIndex(**options)
+
+    raise ValueError(f"Unknown face index: {name}")
@@ -0,0 +1,44 @@
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent
+
+# Legacy layout: one <name>.npy mean embedding per person, migrated into
+# the gallery file on first start
+KNOWN_DIR = BASE_DIR / "known_faces"
+GALLERY_PATH = BASE_DIR / "known_faces.gallery"
+
+# InsightFace model pack, only its detection and recognition models are loaded
+FACE_MODEL = "buffalo_l"
+MODEL_ROOT = "~/.insightface"
+DET_SIZE = (640, 480)     # (w, h) detector input, matches the camera stream
+DET_THRESH = 0.5
+CTX_ID = 0
+PROVIDERS = ["CPUExecutionProvider"]
+
+# Minimum cosine similarity for a match
+THRESHOLD = 0.5
+
+# Gallery search: exact (one matmul over everybody, best up to a few
+# thousand identities) | ivf (numpy inverted lists) | hnsw (needs hnswlib)
+INDEX = "exact"
+INDEX_OPTIONS = {
+    "exact": {},
+    "ivf": {"nprobe": 8},
+    "hnsw": {"m": 16, "ef": 64},
+}
+
+# Detect-then-track mode (face_recognizer --track): detection runs every
+# TRACK_DETECT_EVERY frames or after a track is lost, embeddings only for
+# new faces, optical flow moves the boxes in between
+TRACK_DETECT_EVERY = 10
+TRACK_IOU_THRESHOLD = 0.3
+
+# Motion gating (face_recognizer --gated): faces are only searched while
+# there is motion and for GATE_HOLD_OFF seconds after it stopped
+GATE_HOLD_OFF = 3.0
+GATE_CROP = True          # ignored with --track, the tracker needs full frames
+GATE_MOTION_SCALE = 0.25
+GATE_MIN_AREA = 1500
+
+# Seconds between metrics summaries in the log (utils/metrics.py)
+METRICS_INTERVAL = 60
@@ -0,0 +1,123 @@
+import logging
+import time
+
+from ml.face import config
+from utils import metrics
+from utils.pipeline import StageStats
+
+# Prepared engines by options, loading buffalo_l takes seconds
+_ENGINES = {}
+
+
+class FaceEngine:
+    """
+    InsightFace restricted to what recognition needs: the detector and the
+    ArcFace embedding model. Gender/age and the 2D/3D landmark heads of
+    buffalo_l are dropped at startup and never run.
+
+    - detect(frame) -> (N, 5) boxes with scores, (N, 5, 2) landmarks
+    - embed(frame, kpss) -> (N, 512) embeddings, aligned crops in one batch
+    - analyze(frame) -> boxes, embeddings
+    """
+
+    def __init__(
+        self,
+        model_name: str = config.FACE_MODEL,
+        det_size=config.DET_SIZE,
+        det_thresh: float = config.DET_THRESH,
+        ctx_id: int = config.CTX_ID,
+        providers=config.PROVIDERS,
+        threads: int = None
+    ):
+        """
+        threads: intra-op threads per ONNX Runtime session, None uses every
+        core; set it when several engines share the CPU (one per process).
+        """
+        import glob
+        import os
+
+        import onnxruntime as ort
+        from insightface.model_zoo.model_zoo import ModelRouter
+        from insightface.utils import ensure_available, face_align
+
+        start = time.perf_counter()
+
+        # FaceAnalysis doesn't pass sess_options on to the sessions, so the
+        # pack is routed here; other models are dropped right after routing
+        options = ort.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+            options.inter_op_num_threads = 1
+
+        models = {}
+        model_dir = ensure_available("models", model_name, root=config.MODEL_ROOT)
+        for onnx_file in sorted(glob.glob(os.path.join(model_dir, "*.onnx"))):
+            model = ModelRouter(onnx_file).get_model(sess_options=options, providers=providers)
+            if model is not None and model.taskname in ("detection", "recognition"):
+                models.setdefault(model.taskname, model)
+
+        self.detector = models["detection"]
+        self.recognizer = models["recognition"]
+
+        # det_size is (w, h), both multiples of 32; matching the stream
+        # aspect avoids letterboxing 640x480 frames into 640x640
+        self.detector.prepare(ctx_id, input_size=tuple(det_size), det_thresh=det_thresh)
+        self.recognizer.prepare(ctx_id)
+
+        self.startup_seconds = time.perf_counter() - start
+        self._norm_crop = face_align.norm_crop
+
+        self.stats = {
+            name: StageStats(name, histogram=metrics.stage_timer(name))
+            for name in ("detect", "align", "embed")
+        }
+
+        logging.info(
+            f"Face engine {model_name} ready in {self.startup_seconds:.2f}s "
+            f"(det_size: {det_size}, threads: {threads or 'all'})"
+        )
+
+    def detect(self, frame):
+        start = time.perf_counter()
+        bboxes, kpss = self.detector.detect(frame, max_num=0, metric="default")
+        self.stats["detect"].add(time.perf_counter() - start)
+        return bboxes, kpss
+
+    def embed(self, frame, kpss):
+        start = time.perf_counter()
+        size = self.recognizer.input_size[0]
+        crops = [self._norm_crop(frame, landmark=kps, image_size=size) for kps in kpss]
+        aligned = time.perf_counter()
+
+        embeddings = self.recognizer.get_feat(crops)
+        done = time.perf_counter()
+
+        self.stats["align"].add(aligned - start)
+        self.stats["embed"].add(done - aligned)
+        return embeddings
+
+    def analyze(self, frame):
+        """
+        Detection plus embeddings of every face, the replacement for
+        FaceAnalysis.get(). Returns ((N, 5) boxes, (N, 512) embeddings).
+        """
+        bboxes, kpss = self.detect(frame)
+        if not len(bboxes):
+            return bboxes, None
+        return bboxes, self.embed(frame, kpss)
+
+    def summary(self):
+        return {name: stats.summary() for name, stats in self.stats.items()}
+
+    def log_stats(self):
+        logging.info(f"Face engine timings: {self.summary()}")
+
+
+def get_engine(**options):
+    """
+    Prepared engine for these options, created once per process.
+    """
+    key = tuple(sorted((k, tuple(v) if isinstance(v, list) else v) for k, v in options.items()))
+    if key not in _ENGINES:
+        _ENGINES[key] = FaceEngine(**options)
+    return _ENGINES[key]
@@ -0,0 +1,168 @@
+import argparse
+import logging
+import os
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import cv2
+
+from ml.face import config
+from ml.face.ann import create_index
+from ml.face.engine import get_engine
+from ml.face.gallery import FaceGallery, load_gallery, normalize
+from utils.frame_source import IMAGE_EXTENSIONS
+from utils.logger import setup_logging
+
+# Quality gates for enrollment photos
+MIN_DET_SCORE = 0.7
+MIN_FACE_SIZE = 64        # px, shorter side of the face box
+MIN_SHARPNESS = 40.0      # variance of the Laplacian inside the face box
+
+# Photos further than this (cosine) from their person's mean are dropped
+MIN_CONSISTENCY = 0.4
+
+# One engine per worker process, set by the pool initializer
+_engine = None
+
+
+def _init_worker(threads):
+    global _engine
+    # Workers split the cores instead of each running a thread per core
+    cv2.setNumThreads(1)
+    _engine = get_engine(threads=threads)
+
+
+def embed_image(item):
+    """
+    Runs in a worker process. Returns (person, path, embedding or None, reason).
+    """
+    person, path = item
+
+    frame = cv2.imread(str(path))
+    if frame is None:
+        return person, path, None, "unreadable"
+
+    bboxes, kpss = _engine.detect(frame)
+
+    if len(bboxes) == 0:
+        return person, path, None, "no face"
+    if len(bboxes) > 1:
+        return person, path, None, "several faces"
+
+    x1, y1, x2, y2, score = bboxes[0]
+    if score < MIN_DET_SCORE:
+        return person, path, None, "low score"
+    if min(x2 - x1, y2 - y1) < MIN_FACE_SIZE:
+        return person, path, None, "too small"
+
+    h, w = frame.shape[:2]
+    crop = frame[max(int(y1), 0):min(int(y2), h), max(int(x1), 0):min(int(x2), w)]
+    sharpness = cv2.Laplacian(cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY), cv2.CV_64F).var()
+    if sharpness < MIN_SHARPNESS:
+        return person, path, None, "blurry"
+
+    return person, path, _engine.embed(frame, kpss)[0], "ok"
+
+
+def find_images(root):
+    """
+    (person, path) for every image in root/<person>/, recursively.
+    """
+    items = []
+    for person_dir in sorted(p for p in Path(root).iterdir() if p.is_dir()):
+        for path in sorted(person_dir.rglob("*")):
+            if path.suffix.lower() in IMAGE_EXTENSIONS:
+                items.append((person_dir.name, path))
+    return items
+
+
+def aggregate(embeddings):
+    """
+    Mean of the unit embeddings after dropping inconsistent photos.
+    Returns (mean embedding, number of photos used).
+    """
+    embeddings = normalize(embeddings)
+    mean = normalize(embeddings.mean(axis=0))[0]
+
+    consistent = embeddings @ mean >= MIN_CONSISTENCY
+    if consistent.any():
+        embeddings = embeddings[consistent]
+        mean = normalize(embeddings.mean(axis=0))[0]
+
+    return mean, len(embeddings)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Enroll everybody in <root>/<person>/*.jpg into the face gallery"
+    )
+    parser.add_argument("root", help="Directory with one sub-directory of photos per person")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count(),
+        help="Worker processes, the cores are split between them"
+    )
+    parser.add_argument("--min-images", type=int, default=1, help="Skip people with fewer good photos")
+    parser.add_argument("--gallery", default=str(config.GALLERY_PATH))
+    parser.add_argument("--replace", action="store_true", help="Start a new gallery instead of updating")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    setup_logging(Path("logs") / "enroll_batch.log")
+
+    items = find_images(args.root)
+    logging.info(f"Found {len(items)} images of {len({p for p, _ in items})} people")
+
+    start = time.perf_counter()
+    embeddings = defaultdict(list)
+    reasons = Counter()
+
+    threads = max(1, (os.cpu_count() or 4) // args.workers)
+
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker, initargs=(threads,)) as pool:
+        for person, path, embedding, reason in pool.map(embed_image, items, chunksize=8):
+            reasons[reason] += 1
+            if embedding is None:
+                logging.debug(f"Rejected {path}: {reason}")
+            else:
+                embeddings[person].append(embedding)
+
+    elapsed = time.perf_counter() - start
+    logging.info(
+        f"Embedded {len(items)} images in {elapsed:.1f}s "
+        f"({len(items) / max(elapsed, 1e-9):.1f} img/s), results: {dict(reasons)}"
+    )
+
+    for person in sorted({p for p, _ in items} - embeddings.keys()):
+        logging.warning(f"Skipping {person}: no usable photos")
+
+    # All identities go into the gallery in memory, then one write
+    index = create_index(config.INDEX, **config.INDEX_OPTIONS[config.INDEX])
+    if args.replace:
+        gallery = FaceGallery(index=index)
+    else:
+        # The legacy known_faces directory only migrates into the default gallery
+        default = Path(args.gallery).resolve() == Path(config.GALLERY_PATH).resolve()
+        gallery = load_gallery(args.gallery, config.KNOWN_DIR if default else None, index=index)
+
+    enrolled = 0
+    for person, person_embeddings in sorted(embeddings.items()):
+        mean, used = aggregate(person_embeddings)
+        if used < args.min_images:
+            logging.warning(f"Skipping {person}: {used} good photos")
+            continue
+
+        gallery.add(person, mean)
+        enrolled += 1
+
+    gallery.save(args.gallery)
+    logging.info(f"Enrolled {enrolled} people, gallery: {len(gallery)} identities in {args.gallery}")
+
+
+if __name__ == "__main__":
+    main()
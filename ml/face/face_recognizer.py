@@ -1,47 +1,109 @@
-import os
-import numpy as np
+import argparse
+import logging
+from pathlib import Path
 import cv2
-from insightface.app import FaceAnalysis
-from sklearn.metrics.pairwise import cosine_similarity
 
+from computer_vision.gating import MotionGate
+from computer_vision.motion import MotionDetector
+from ml.face import config
+from ml.face.ann import create_index
+from ml.face.engine import get_engine
+from ml.face.gallery import load_gallery
+from ml.face.tracker import FaceTracker
+from utils import metrics
 from utils.camera import CameraManager
-
-KNOWN_DIR = "ml/face/known_faces"
-THRESHOLD = 0.5
-
-def load_known_faces():
-    known = {}
-    for file in os.listdir(KNOWN_DIR):
-        if file.endswith(".npy"):
-            name = file.replace(".npy", "")
-            known[name] = np.load(os.path.join(KNOWN_DIR, file))
-    return known
+from utils.display import create_display
+from utils.logger import setup_logging
+from utils.pipeline import Pipeline
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Real-time face recognition")
+    parser.add_argument(
+        "--track",
+        action="store_true",
+        help="Detect every few frames and track in between instead of full analysis per frame"
+    )
+    parser.add_argument(
+        "--gated",
+        action="store_true",
+        help="Search for faces only while the motion detector sees movement"
+    )
+    parser.add_argument(
+        "--stream",
+        type=int,
+        metavar="PORT",
+        help="Serve the annotated frames as MJPEG on this port instead of a window"
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        metavar="PORT",
+        help="Serve Prometheus metrics at /metrics on this port (also on the --stream port)"
+    )
+    return parser.parse_args()
+
+def offset_results(results, dx, dy):
+    return [(box + (dx, dy, dx, dy), label) for box, label in results]
 
 def main():
-    app = FaceAnalysis(name="buffalo_l")
-    app.prepare(ctx_id=0)
-
-    known_faces = load_known_faces()
-
-    with CameraManager() as camera:
-        while True:
-            frame = camera.capture_array()
-            faces = app.get(frame)
-
-            for face in faces:
-                box = face.bbox.astype(int)
-                embedding = face.embedding
-
-                name = "Unknown"
-                for known_name, known_embedding in known_faces.items():
-                    sim = cosine_similarity(
-                        [embedding],
-                        [known_embedding]
-                    )[0][0]
-
-                    if sim > THRESHOLD:
-                        name = f"{known_name} ({sim:.2f})"
-
+    args = parse_args()
+    setup_logging(Path("logs") / "face_recognition.log")
+
+    engine = get_engine()
+
+    gallery = load_gallery(
+        config.GALLERY_PATH,
+        config.KNOWN_DIR,
+        index=create_index(config.INDEX, **config.INDEX_OPTIONS[config.INDEX]),
+        save=False
+    )
+
+    tracker = None
+    if args.track:
+        tracker = FaceTracker(
+            engine.detect,
+            engine.embed,
+            gallery,
+            config.THRESHOLD,
+            detect_every=config.TRACK_DETECT_EVERY,
+            iou_threshold=config.TRACK_IOU_THRESHOLD
+        )
+
+    def process(frame):
+        """
+        Detection and recognition, runs in the pipeline's processing thread.
+        Returns a list of (box, label) pairs.
+        """
+        if tracker:
+            return tracker.process(frame)
+
+        bboxes, embeddings = engine.analyze(frame)
+        if not len(bboxes):
+            return []
+
+        # All faces against all identities in one matrix multiply
+        matches = gallery.match(embeddings, config.THRESHOLD)
+
+        results = []
+        for bbox, (name, score) in zip(bboxes, matches):
+            label = f"{name} ({score:.2f})" if name else "Unknown"
+            results.append((bbox[:4].astype(int), label))
+
+        return results
+
+    display = create_display("Face Recognition", args.stream, exit_keys=(ord("q"),))
+
+    if args.metrics_port:
+        metrics.serve(args.metrics_port)
+    draw_timer = metrics.stage_timer("draw")
+
+    def output(frame, results):
+        # Nothing to draw while no stream client is watching
+        if not display.wants():
+            return display.show(frame)
+
+        with draw_timer.time():
+            for box, name in results:
                 cv2.rectangle(frame, box[:2], box[2:], (0,255,0), 2)
                 cv2.putText(
                     frame,
@@ -53,14 +115,30 @@ def main():
                     2
                 )
 
-            cv2.imshow("Face Recognition", frame)
+        return display.show(frame)
+
+    gate = None
+    if args.gated:
+        gate = MotionGate(
+            MotionDetector(scale=config.GATE_MOTION_SCALE, min_area=config.GATE_MIN_AREA),
+            hold_off=config.GATE_HOLD_OFF,
+            crop=config.GATE_CROP and not args.track
+        )
+        process = gate.wrap(process, list, offset_results)
 
-            if cv2.waitKey(1) == ord("q"):
-                break
+    try:
+        with metrics.Reporter(config.METRICS_INTERVAL), CameraManager() as camera:
+            Pipeline(camera, process, output).run()
+    finally:
+        display.close()
 
-    cv2.destroyAllWindows()
+    if gate:
+        gate.log_stats()
+
+    engine.log_stats()
+    if tracker:
+        logging.info(f"Tracker stats: {tracker.stats}")
 
 
 if __name__ == "__main__":
     main()
-
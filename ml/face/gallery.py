@@ -0,0 +1,292 @@
+import json
+import logging
+import os
+import tempfile
+import uuid
+from pathlib import Path
+
+import numpy as np
+
+EMBEDDING_DIM = 512
+
+
+def normalize(embeddings):
+    """
+    L2-normalize embeddings row-wise into a contiguous float32 (N, D) array.
+    """
+    embeddings = np.array(embeddings, dtype=np.float32, ndmin=2, order="C")
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    embeddings /= np.maximum(norms, 1e-12)
+    return embeddings
+
+
+class FaceGallery:
+    """
+    Known identities as one contiguous float32 matrix of unit-length
+    embeddings, so cosine similarity against everybody is a single matmul.
+
+    With an ANN `index` (see ml/face/ann.py) matching only scores a subset
+    of the gallery; add() and remove() update it incrementally.
+
+    File format (one file, the matrix can be memory-mapped):
+    - the (N, D) float32 matrix as a regular .npy array
+    - followed by JSON {"names": [...], "token": ...}, older files have
+      only the names list
+
+    The index is saved next to it as <path><index suffix>, plus a .json
+    with the token of the gallery file it belongs to; a missing or
+    mismatched index is rebuilt on load, and saved again unless the
+    gallery is opened read-only.
+    """
+
+    def __init__(self, dim: int = EMBEDDING_DIM, index=None):
+        self.names = []
+        self._rows = {}
+
+        # Rows [0, _count) of a buffer that grows by doubling
+        self._data = np.empty((0, dim), dtype=np.float32)
+        self._count = 0
+
+        # Changes on every save, ties a saved index to this gallery file
+        self.token = None
+
+        self.index = None
+        if index is not None:
+            self.set_index(index)
+
+    @property
+    def embeddings(self):
+        return self._data[:self._count]
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, name):
+        return name in self._rows
+
+    def set_index(self, index):
+        """
+        Use an ANN index for matching, built from the current identities.
+        """
+        index.build(self.embeddings)
+        self.index = index
+
+    def _reserve(self, size):
+        # A loaded gallery is a read-only memmap, copy it on first change
+        if size <= len(self._data) and self._data.flags.writeable:
+            return
+
+        data = np.empty((max(size, 2 * len(self._data), 16), self._data.shape[1]), dtype=np.float32)
+        data[:self._count] = self.embeddings
+        self._data = data
+
+    def add(self, name: str, embedding):
+        """
+        Add an identity or replace the embedding of an existing one.
+        """
+        embedding = normalize(embedding)[0]
+
+        row = self._rows.get(name)
+        if row is None:
+            row = self._count
+            self._reserve(row + 1)
+            self.names.append(name)
+            self._rows[name] = row
+            self._count += 1
+        else:
+            self._reserve(self._count)
+            if self.index is not None:
+                self.index.remove(row)
+
+        self._data[row] = embedding
+
+        if self.index is not None:
+            if self.index.stale(self._count):
+                self.index.build(self.embeddings)
+            else:
+                self.index.add(row, embedding)
+
+    def remove(self, name: str):
+        """
+        Remove an identity, the last row is moved into its place.
+        """
+        row = self._rows.pop(name)
+        last = self._count - 1
+        self._reserve(self._count)
+
+        if self.index is not None:
+            self.index.remove(row)
+            if row != last:
+                self.index.remove(last)
+
+        if row != last:
+            self._data[row] = self._data[last]
+            self.names[row] = self.names[last]
+            self._rows[self.names[row]] = row
+            if self.index is not None:
+                self.index.add(row, self._data[row])
+
+        self.names.pop()
+        self._count -= 1
+
+    def similarities(self, embeddings):
+        """
+        (F, N) cosine similarities of F query embeddings to all identities.
+        """
+        return normalize(embeddings) @ self.embeddings.T
+
+    def match(self, embeddings, threshold: float):
+        """
+        Best identity for each query embedding.
+        Returns a list of (name or None, score), one per query.
+        """
+        embeddings = np.asarray(embeddings)
+        if not len(embeddings):
+            return []
+        if not self._count:
+            return [(None, 0.0)] * len(embeddings)
+
+        if self.index is not None:
+            best, scores = self.index.search(normalize(embeddings), self.embeddings)
+        else:
+            similarities = self.similarities(embeddings)
+            best = similarities.argmax(axis=1)
+            scores = similarities[np.arange(len(best)), best]
+
+        return [
+            (self.names[i] if i >= 0 and score >= threshold else None, float(score))
+            for i, score in zip(best, scores)
+        ]
+
+    def save(self, path):
+        """
+        Write the gallery atomically, readers of the old file are not affected.
+        """
+        path = Path(path)
+        self.token = uuid.uuid4().hex
+
+        with tempfile.NamedTemporaryFile(dir=path.parent, prefix=path.name, suffix=".tmp", delete=False) as f:
+            np.lib.format.write_array(f, np.ascontiguousarray(self.embeddings, dtype=np.float32))
+            f.write(json.dumps({"names": self.names, "token": self.token}).encode())
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.replace(f.name, path)
+
+        if self.index is not None:
+            self.save_index(path)
+
+    def _index_paths(self, path):
+        index_path = Path(str(path) + self.index.suffix)
+        return index_path, index_path.with_name(index_path.name + ".json")
+
+    def save_index(self, path):
+        """
+        Save the index for the gallery file at `path`. The metadata is
+        written last, so an interrupted save only causes a rebuild.
+        """
+        index_path, meta_path = self._index_paths(path)
+        self.index.save(index_path)
+
+        with tempfile.NamedTemporaryFile(
+            "w", dir=meta_path.parent, prefix=meta_path.name, suffix=".tmp", delete=False
+        ) as f:
+            json.dump({"token": self.token, "size": self._count}, f)
+        os.replace(f.name, meta_path)
+
+    def _load_index(self, path, index, save: bool = True):
+        """
+        Use the index saved for this gallery file if it matches, otherwise
+        build it and, with `save`, write it for the next start.
+        Returns True if loaded.
+        """
+        self.index = index
+        index_path, meta_path = self._index_paths(path)
+
+        try:
+            meta = json.loads(meta_path.read_text())
+            if meta == {"token": self.token, "size": self._count}:
+                index.load(index_path, self._data.shape[1])
+                return True
+        except (OSError, ValueError, KeyError):
+            pass
+
+        self.set_index(index)
+        if save:
+            # Only a cache, the gallery works without it
+            try:
+                self.save_index(path)
+            except OSError as e:
+                logging.warning(f"Could not save the index of {path}: {e}")
+        return False
+
+    @classmethod
+    def load(cls, path, mmap: bool = True, index=None, save: bool = True):
+        with open(path, "rb") as f:
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, _, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, _, dtype = np.lib.format.read_array_header_2_0(f)
+            offset = f.tell()
+
+            f.seek(offset + int(np.prod(shape)) * dtype.itemsize)
+            footer = json.loads(f.read().decode())
+
+        # Files written before the token was added hold just the names
+        if isinstance(footer, list):
+            footer = {"names": footer, "token": None}
+        names = footer["names"]
+
+        gallery = cls(shape[1])
+        gallery.token = footer["token"]
+        gallery.names = names
+        gallery._rows = {name: row for row, name in enumerate(names)}
+        gallery._count = len(names)
+
+        if mmap and len(names):
+            gallery._data = np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=shape)
+        else:
+            gallery._data = np.load(path)
+
+        if index is not None and not gallery._load_index(path, index, save):
+            logging.info(f"Rebuilt the {index.suffix[1:]} index of {path}")
+
+        return gallery
+
+    @classmethod
+    def from_directory(cls, directory):
+        """
+        Build a gallery from the legacy layout of one <name>.npy per person.
+        """
+        gallery = cls()
+        for file in sorted(Path(directory).glob("*.npy")):
+            gallery.add(file.stem, np.load(file))
+        return gallery
+
+
+def load_gallery(path, known_dir=None, index=None, save: bool = True):
+    """
+    Load the gallery file, migrating a legacy known_faces directory on the
+    first start. Returns an empty gallery if neither exists.
+
+    save=False is for processes that only match: nothing is written next
+    to the gallery, a migrated or rebuilt index stays in memory.
+    """
+    path = Path(path)
+    if path.exists():
+        gallery = FaceGallery.load(path, index=index, save=save)
+        logging.info(f"Loaded {len(gallery)} identities from {path}")
+        return gallery
+
+    gallery = FaceGallery()
+    if known_dir and Path(known_dir).is_dir():
+        gallery = FaceGallery.from_directory(known_dir)
+
+    if index is not None:
+        gallery.set_index(index)
+
+    if len(gallery) and save:
+        gallery.save(path)
+        logging.info(f"Migrated {len(gallery)} identities from {known_dir} to {path}")
+    return gallery
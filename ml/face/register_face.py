@@ -1,18 +1,47 @@
-import os
+import argparse
 import numpy as np
 import cv2
-from insightface.app import FaceAnalysis
 
+from ml.face import config
+from ml.face.ann import create_index
+from ml.face.engine import get_engine
+from ml.face.gallery import load_gallery
 from utils.camera import CameraManager
 
-SAVE_DIR = "ml/face/known_faces"
 NAME = "maksim"
 
+def open_gallery():
+    """
+    Gallery with its saved ANN index, so add/remove update the index
+    in place instead of rebuilding it.
+    """
+    return load_gallery(
+        config.GALLERY_PATH,
+        config.KNOWN_DIR,
+        index=create_index(config.INDEX, **config.INDEX_OPTIONS[config.INDEX])
+    )
+
+def remove_face(name):
+    gallery = open_gallery()
+    if name not in gallery:
+        print(f"{name} is not registered")
+        return
+
+    gallery.remove(name)
+    gallery.save(config.GALLERY_PATH)
+    print(f"{name} removed! Gallery: {len(gallery)} identities")
+
 def main():
-    os.makedirs(SAVE_DIR, exist_ok=True)
+    parser = argparse.ArgumentParser(description="Register a face from the camera")
+    parser.add_argument("--name", default=NAME)
+    parser.add_argument("--remove", action="store_true", help="Remove the identity instead")
+    args = parser.parse_args()
+
+    if args.remove:
+        remove_face(args.name)
+        return
 
-    app = FaceAnalysis(name="buffalo_l")
-    app.prepare(ctx_id=0)
+    engine = get_engine()
 
     embeddings = []
 
@@ -21,18 +50,21 @@ def main():
 
         while True:
             frame = camera.capture_array()
-            faces = app.get(frame)
 
-            for face in faces:
-                box = face.bbox.astype(int)
-                cv2.rectangle(frame, box[:2], box[2:], (0,255,0), 2)
+            # Only detection per frame, the embedding is computed on 's'
+            bboxes, kpss = engine.detect(frame)
 
-            cv2.imshow("Register Face", frame)
+            preview = frame.copy()
+            for bbox in bboxes:
+                box = bbox[:4].astype(int)
+                cv2.rectangle(preview, box[:2], box[2:], (0,255,0), 2)
+
+            cv2.imshow("Register Face", preview)
 
             key = cv2.waitKey(1)
 
-            if key == ord("s") and faces:
-                embeddings.append(faces[0].embedding)
+            if key == ord("s") and len(bboxes):
+                embeddings.append(engine.embed(frame, kpss[:1])[0])
                 print(f"Saved: {len(embeddings)}")
 
             if key == ord("q"):
@@ -40,9 +72,13 @@ def main():
 
     if embeddings:
         mean_embedding = np.mean(embeddings, axis=0)
-        np.save(f"{SAVE_DIR}/{NAME}.npy", mean_embedding)
-        print("Face photo saved!")
 
+        gallery = open_gallery()
+        gallery.add(args.name, mean_embedding)
+        gallery.save(config.GALLERY_PATH)
+        print(f"Face saved! Gallery: {len(gallery)} identities")
+
+    print(f"Timings: {engine.summary()}")
     cv2.destroyAllWindows()
 
 
@@ -0,0 +1,185 @@
+import cv2
+import numpy as np
+
+from utils.boxes import box_iou
+
+# Optical flow settings for carrying boxes between keyframes
+MAX_CORNERS = 30
+MIN_POINTS = 4
+LK_PARAMS = {
+    "winSize": (15, 15),
+    "maxLevel": 2,
+    "criteria": (cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 0.03),
+}
+
+
+class Track:
+    __slots__ = ("id", "box", "name", "score", "missed")
+
+    def __init__(self, track_id, box):
+        self.id = track_id
+        self.box = np.asarray(box[:4], dtype=np.float32)
+        self.name = None
+        self.score = 0.0
+        self.missed = 0
+
+
+class FaceTracker:
+    """
+    Detect-then-track face recognition on top of FaceEngine-style
+    detect(frame) and embed(frame, kpss) callables.
+
+    - keyframes (every `detect_every` frames, or right after a track was
+      lost) run face detection and associate boxes to tracks by IoU
+    - only new tracks, and tracks still unknown, are embedded and matched
+      against the gallery, known tracks keep their cached identity
+    - frames in between move each box by the median optical flow of the
+      corners inside it, no neural network runs at all
+    """
+
+    def __init__(
+        self,
+        detect,
+        embed,
+        gallery,
+        threshold: float,
+        detect_every: int = 10,
+        iou_threshold: float = 0.3,
+        max_missed: int = 1
+    ):
+        self.detect = detect
+        self.embed = embed
+        self.gallery = gallery
+        self.threshold = threshold
+        self.detect_every = detect_every
+        self.iou_threshold = iou_threshold
+        self.max_missed = max_missed
+
+        self.tracks = []
+        self._next_id = 0
+        self._prev_gray = None
+        self._since_keyframe = 0
+        self._force_keyframe = True
+
+        self.stats = {
+            "frames": 0,
+            "keyframes": 0,
+            "embeddings": 0,
+            "lost": 0,
+        }
+
+    def process(self, frame):
+        """
+        Returns a list of (box, label) pairs like the per-frame recognizer.
+        """
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        self.stats["frames"] += 1
+
+        if self._force_keyframe or self._since_keyframe >= self.detect_every - 1:
+            self._keyframe(frame)
+        else:
+            self._propagate(gray)
+            self._since_keyframe += 1
+
+        self._prev_gray = gray
+
+        results = []
+        for track in self.tracks:
+            label = f"{track.name} ({track.score:.2f})" if track.name else "Unknown"
+            results.append((track.box.astype(int), label))
+        return results
+
+    def _keyframe(self, frame):
+        self.stats["keyframes"] += 1
+        self._since_keyframe = 0
+        self._force_keyframe = False
+
+        bboxes, kpss = self.detect(frame)
+
+        # Greedy IoU association, best overlaps first
+        matched = {}
+        if self.tracks and len(bboxes):
+            iou = box_iou([t.box for t in self.tracks], bboxes[:, :4])
+            for flat in np.argsort(-iou, axis=None):
+                t, d = (int(i) for i in np.unravel_index(flat, iou.shape))
+                if iou[t, d] < self.iou_threshold:
+                    break
+                if t in matched or d in matched.values():
+                    continue
+                matched[t] = d
+
+        tracks = []
+        for t, track in enumerate(self.tracks):
+            if t in matched:
+                track.box[:] = bboxes[matched[t], :4]
+                track.missed = 0
+                tracks.append(track)
+            else:
+                track.missed += 1
+                if track.missed <= self.max_missed:
+                    tracks.append(track)
+
+        detections = {d: self.tracks[t] for t, d in matched.items()}
+        for d in range(len(bboxes)):
+            if d not in detections:
+                track = Track(self._next_id, bboxes[d])
+                self._next_id += 1
+                detections[d] = track
+                tracks.append(track)
+
+        self.tracks = tracks
+
+        # Embeddings only for faces without an identity yet
+        pending = [d for d, track in detections.items() if track.name is None]
+        if pending:
+            embeddings = self.embed(frame, kpss[pending])
+            self.stats["embeddings"] += len(pending)
+
+            for d, (name, score) in zip(pending, self.gallery.match(embeddings, self.threshold)):
+                detections[d].name = name
+                detections[d].score = score
+
+    def _propagate(self, gray):
+        if not self.tracks:
+            return
+
+        h, w = gray.shape
+        points = []
+        owners = []
+
+        for i, track in enumerate(self.tracks):
+            x1, y1, x2, y2 = track.box.clip(0, [w, h, w, h]).astype(int)
+            if x2 - x1 < 8 or y2 - y1 < 8:
+                continue
+
+            corners = cv2.goodFeaturesToTrack(self._prev_gray[y1:y2, x1:x2], MAX_CORNERS, 0.01, 3)
+            if corners is None:
+                continue
+
+            points.append(corners.reshape(-1, 2) + (x1, y1))
+            owners.append(np.full(len(corners), i))
+
+        moved = np.zeros(len(self.tracks), dtype=bool)
+
+        if points:
+            points = np.concatenate(points).astype(np.float32)
+            owners = np.concatenate(owners)
+
+            new_points, status, _ = cv2.calcOpticalFlowPyrLK(self._prev_gray, gray, points, None, **LK_PARAMS)
+            good = status[:, 0] == 1
+
+            for i, track in enumerate(self.tracks):
+                mask = good & (owners == i)
+                if mask.sum() < MIN_POINTS:
+                    continue
+
+                dx, dy = np.median(new_points[mask] - points[mask], axis=0)
+                track.box += (dx, dy, dx, dy)
+                moved[i] = True
+
+        # A lost track triggers detection on the next frame
+        lost = np.count_nonzero(~moved)
+        if lost:
+            self.stats["lost"] += int(lost)
+            self.tracks = [t for t, ok in zip(self.tracks, moved) if ok]
+            self._force_keyframe = True
@@ -0,0 +1,44 @@
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent
+MODELS_DIR = BASE_DIR / "models"
+
+MODEL_PATH = MODELS_DIR / "yolov8n.onnx"
+
+# Static INT8 model produced by ml/yolo/quantize_model.py
+INT8_MODEL_PATH = MODELS_DIR / "yolov8n.int8.onnx"
+CALIBRATION_DIR = BASE_DIR / "datasets/mandarin/images"
+
+CONF_THRESHOLD = 0.5
+NMS_THRESHOLD = 0.4
+
+# ONNX Runtime session tuning, defaults for the 4-core Pi 5
+PROVIDERS = ["CPUExecutionProvider"]
+INTRA_OP_THREADS = 4
+INTER_OP_THREADS = 1
+EXECUTION_MODE = "sequential"      # sequential | parallel
+GRAPH_OPTIMIZATION = "all"         # disable | basic | extended | all
+ENABLE_MEM_ARENA = True
+
+# Save the optimized graph next to the model and load it on later starts
+CACHE_OPTIMIZED_MODEL = True
+
+# Bind the reused input tensor and a preallocated output buffer
+USE_IO_BINDING = True
+
+# Motion gating (main.py --gated): YOLO only runs while there is motion and
+# for GATE_HOLD_OFF seconds after it stopped
+GATE_HOLD_OFF = 2.0
+GATE_CROP = False         # detect on the moving region only
+GATE_MOTION_SCALE = 0.25
+GATE_MIN_AREA = 1500
+
+# Tracking (main.py --track): detection every DETECT_EVERY frames, Kalman
+# prediction in between; a track is counted after TRACK_MIN_HITS matches
+DETECT_EVERY = 2
+TRACK_IOU_THRESHOLD = 0.3
+TRACK_MIN_HITS = 3
+TRACK_MAX_MISSES = 3
+
+# Seconds between metrics summaries in the log (utils/metrics.py)
+METRICS_INTERVAL = 60
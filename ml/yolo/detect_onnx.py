@@ -1,31 +1,119 @@
-import cv2
 import numpy as np
 import onnxruntime as ort
 
+from ml.yolo import config
+from ml.yolo.detections import Detections
+from ml.yolo.preprocess import LetterboxPreprocessor
+from ml.yolo.session import create_session
+from utils import metrics
+from utils.boxes import nms
+
+# COCO dataset class names, index = class id
+COCO_CLASSES = [
+    "person", "bicycle", "car", "motorcycle", "airplane",
+    "bus", "train", "truck", "boat", "traffic light",
+    "fire hydrant", "stop sign", "parking meter", "bench",
+    "bird", "cat", "dog", "horse", "sheep", "cow",
+    "elephant", "bear", "zebra", "giraffe",
+    "backpack", "umbrella", "handbag", "tie",
+    "suitcase", "frisbee", "skis", "snowboard",
+    "sports ball", "kite", "baseball bat", "baseball glove",
+    "skateboard", "surfboard", "tennis racket",
+    "bottle", "wine glass", "cup", "fork", "knife",
+    "spoon", "bowl", "banana", "apple", "sandwich",
+    "orange", "broccoli", "carrot", "hot dog", "pizza",
+    "donut", "cake", "chair", "couch", "potted plant",
+    "bed", "dining table", "toilet", "tv", "laptop",
+    "mouse", "remote", "keyboard", "cell phone",
+    "microwave", "oven", "toaster", "sink",
+    "refrigerator", "book", "clock", "vase",
+    "scissors", "teddy bear", "hair drier", "toothbrush"
+]
+
+
+def decode_predictions(predictions, conf_threshold: float, nms_threshold: float):
+    """
+    Decode a single YOLOv8 prediction tensor into detection arrays.
+
+    The model returns (4 + num_classes, 8400) candidates per image. All of
+    them are processed at once: best class per column, confidence filtering
+    with a boolean mask, box conversion and class-aware NMS on arrays.
+
+    Returns (boxes, scores, class_ids):
+    - boxes: (N, 4) float32 in model input pixels, (x1, y1, x2, y2)
+    - scores: (N,) float32
+    - class_ids: (N,) int64
+    """
+    # Best class score for every candidate column
+    class_scores = predictions[4:]
+    confidences = class_scores.max(axis=0)
+
+    # Drop weak candidates before any further work
+    mask = confidences > conf_threshold
+    candidates = predictions[:4, mask]
+    scores = confidences[mask].astype(np.float32)
+    class_ids = class_scores[:, mask].argmax(axis=0)
+
+    # cx, cy, w, h -> x1, y1, x2, y2
+    cx, cy, bw, bh = candidates
+
+    boxes = np.empty((scores.size, 4), dtype=np.float32)
+    boxes[:, 0] = cx - bw / 2
+    boxes[:, 1] = cy - bh / 2
+    boxes[:, 2] = cx + bw / 2
+    boxes[:, 3] = cy + bh / 2
+
+    # Apply class-aware Non-Maximum Suppression (NMS)
+    keep = nms(boxes, scores, nms_threshold, class_ids)
+
+    return boxes[keep], scores[keep], class_ids[keep]
+
+
 class YOLODetector:
     """
     YOLOv8 ONNX object detector using ONNX Runtime.
     Designed for real-time inference on Raspberry Pi 5.
     """
 
-    def __init__(self, model_path: str, conf_threshold: float = 0.5):
+    def __init__(
+        self,
+        model_path: str,
+        conf_threshold: float = config.CONF_THRESHOLD,
+        nms_threshold: float = config.NMS_THRESHOLD,
+        session_options: dict = None,
+        io_binding: bool = config.USE_IO_BINDING
+    ):
         # Confidence threshold for filtering detections
         self.conf_threshold = conf_threshold
 
-        # Load ONNX model
-        self.session = ort.InferenceSession(
-            model_path,
-            providers=["CPUExecutionProvider"]
-        )
+        # IoU threshold for Non-Maximum Suppression
+        self.nms_threshold = nms_threshold
 
+        # Load ONNX model, see ml/yolo/session.py for the tunable options
+        self.session = create_session(model_path, **(session_options or {}))
 
-        # Get model input details
+        # Get model input/output details
         self.input_name = self.session.get_inputs()[0].name
         self.input_shape = self.session.get_inputs()[0].shape
+        self.output_name = self.session.get_outputs()[0].name
+
+        # IO binding: the input tensor is bound once and results are written
+        # into a preallocated output buffer instead of a new array per run
+        self.io_binding = self.session.io_binding() if io_binding else None
+        self._bound_input = None
+        self._output_buffer = None
 
         # YOLOv8 default input size
         self.img_size = 640
 
+        # Letterbox into a reused input tensor
+        self.preprocessor = LetterboxPreprocessor(self.img_size)
+
+        self.timers = {
+            stage: metrics.stage_timer(stage)
+            for stage in ("preprocess", "inference", "postprocess")
+        }
+
         # COCO class names
         self.class_names = self._load_coco_classes()
     
@@ -33,114 +121,99 @@ class YOLODetector:
         """
         Returns list of COCO dataset class names.
         """
-        return [
-            "person", "bicycle", "car", "motorcycle", "airplane",
-            "bus", "train", "truck", "boat", "traffic light",
-            "fire hydrant", "stop sign", "parking meter", "bench",
-            "bird", "cat", "dog", "horse", "sheep", "cow",
-            "elephant", "bear", "zebra", "giraffe",
-            "backpack", "umbrella", "handbag", "tie",
-            "suitcase", "frisbee", "skis", "snowboard",
-            "sports ball", "kite", "baseball bat", "baseball glove",
-            "skateboard", "surfboard", "tennis racket",
-            "bottle", "wine glass", "cup", "fork", "knife",
-            "spoon", "bowl", "banana", "apple", "sandwich",
-            "orange", "broccoli", "carrot", "hot dog", "pizza",
-            "donut", "cake", "chair", "couch", "potted plant",
-            "bed", "dining table", "toilet", "tv", "laptop",
-            "mouse", "remote", "keyboard", "cell phone",
-            "microwave", "oven", "toaster", "sink",
-            "refrigerator", "book", "clock", "vase",
-            "scissors", "teddy bear", "hair drier", "toothbrush"
-        ]
+        return list(COCO_CLASSES)
     
     def preprocess(self, frame):
         """
         Prepare image for YOLO model:
-        - resize
+        - letterbox resize (keeps aspect ratio)
         - normalize
         - convert HWC -> CHW
-        - add batch dimension
+        The returned tensor is a preallocated buffer reused across frames.
         """
-        img = cv2.resize(frame, (self.img_size, self.img_size))
-        img = cv2.cvtColor(img, cv2.COLOR_RGB2BGR)
-        img = img.astype(np.float32) / 255.0
-        img = np.transpose(img, (2, 0, 1))
-        img = np.expand_dims(img, axis=0)
-        return img
-    
-    def postprocess(self, outputs, frame):
+        return self.preprocessor(frame)
+
+    def postprocess(self, outputs, index: int = 0):
         """
-        Convert model output into bounding boxes.
-        Apply confidence filtering and NMS.
+        Convert model output for one batch item into a Detections result
+        in frame pixel coordinates of the last preprocessed frame size.
+        Drawing is left to ml.yolo.render so headless runs skip it.
         """
-        predictions = outputs[0][0]
-        predictions = np.transpose(predictions)
-
-        h, w, _ = frame.shape
-
-        boxes = []
-        confidences = []
-        class_ids = []
-
-        for pred in predictions:
-            scores = pred[4:]
-            class_id = np.argmax(scores)
-            confidence = scores[class_id]
-
-            if confidence > self.conf_threshold:
-                x, y, width, height = pred[0:4]
-
-                x1 = int((x - width / 2) * w / self.img_size)
-                y1 = int((y - height / 2) * h / self.img_size)
-                x2 = int((x + width / 2) * w / self.img_size)
-                y2 = int((y + height / 2) * h / self.img_size)
-
-                boxes.append([x1, y1, x2 - x1, y2 - y1])
-                confidences.append(float(confidence))
-                class_ids.append(class_id)
-
-        # Apply Non-Maximum Suppression (NMS)
-        indices = cv2.dnn.NMSBoxes(
-            boxes,
-            confidences,
+        boxes, scores, class_ids = decode_predictions(
+            outputs[0][index],
             self.conf_threshold,
-            0.4
+            self.nms_threshold
         )
+        self.preprocessor.restore_boxes(boxes)
+        return Detections(boxes, scores, class_ids)
+
+    def infer(self, input_tensor):
+        """
+        Run the model on a preprocessed (1, 3, H, W) tensor.
+        With IO binding the returned output is a buffer reused by the next
+        call, so it must be postprocessed before inferring again.
+        """
+        if self.io_binding is None:
+            return self.session.run(None, {self.input_name: input_tensor})
+
+        if self._output_buffer is None:
+            # First run learns the output shape for the preallocated buffer
+            outputs = self.session.run(None, {self.input_name: input_tensor})
+            self._output_buffer = np.empty_like(outputs[0])
+            self.io_binding.bind_ortvalue_output(
+                self.output_name,
+                ort.OrtValue.ortvalue_from_numpy(self._output_buffer)
+            )
+            return outputs
+
+        if self._bound_input is not input_tensor:
+            self.io_binding.bind_cpu_input(self.input_name, input_tensor)
+            self._bound_input = input_tensor
+
+        self.session.run_with_iobinding(self.io_binding)
+        return [self._output_buffer]
 
-        if len(indices) > 0:
-            for i in indices.flatten():
-                x, y, w_box, h_box = boxes[i]
-                class_id = class_ids[i]
-                confidence = confidences[i]
-
-                label = self.class_names[class_id]
-
-                cv2.rectangle(
-                    frame, 
-                    (x, y), 
-                    (x + w_box, y + h_box), 
-                    (0, 255, 0), 
-                    2
-                )
-
-                cv2.putText(
-                    frame,
-                    f"{label} {confidence:.2f}",
-                    (x, y - 10),
-                    cv2.FONT_HERSHEY_SIMPLEX,
-                    0.5,
-                    (0, 255, 0),
-                    2
-                )
-        
-        return frame
-    
     def detect(self, frame):
         """
         Full inference pipeline:
         preprocess -> inference -> postprocess
         """
-        input_tensor = self.preprocess(frame)
+        with self.timers["preprocess"].time():
+            input_tensor = self.preprocess(frame)
+        with self.timers["inference"].time():
+            outputs = self.infer(input_tensor)
+        with self.timers["postprocess"].time():
+            return self.postprocess(outputs)
+
+    @property
+    def dynamic_batch(self):
+        """
+        True when the model was exported with a dynamic batch axis
+        (e.g. Ultralytics export with dynamic=True).
+        """
+        return not isinstance(self.input_shape[0], int)
+
+    def detect_batch(self, frames):
+        """
+        Run detection on several same-sized frames with one session call.
+        Frames are letterboxed into one (N, 3, H, W) tensor and the output
+        is split back into one Detections per frame. Models with a fixed
+        batch size of one fall back to per-frame inference.
+        """
+        if not frames:
+            return []
+
+        if not self.dynamic_batch:
+            return [self.detect(frame) for frame in frames]
+
+        if any(frame.shape != frames[0].shape for frame in frames):
+            raise ValueError("detect_batch expects frames of the same size")
+
+        self.preprocessor.reserve(len(frames))
+        for i, frame in enumerate(frames):
+            self.preprocessor(frame, index=i)
+
+        input_tensor = self.preprocessor.input_tensor[:len(frames)]
         outputs = self.session.run(None, {self.input_name: input_tensor})
-        return self.postprocess(outputs, frame)
+
+        return [self.postprocess(outputs, i) for i in range(len(frames))]
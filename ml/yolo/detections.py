@@ -0,0 +1,38 @@
+import numpy as np
+
+
+class Detections:
+    """
+    Compact, array-backed detection result for one frame.
+    - boxes: (N, 4) float32, (x1, y1, x2, y2) in frame pixels
+    - scores: (N,) float32
+    - class_ids: (N,) int64
+    """
+
+    __slots__ = ("boxes", "scores", "class_ids")
+
+    def __init__(self, boxes, scores, class_ids):
+        self.boxes = boxes
+        self.scores = scores
+        self.class_ids = class_ids
+
+    @classmethod
+    def empty(cls):
+        return cls(
+            np.empty((0, 4), dtype=np.float32),
+            np.empty(0, dtype=np.float32),
+            np.empty(0, dtype=np.int64)
+        )
+
+    def offset(self, dx, dy):
+        """
+        Shift boxes in place, e.g. from a crop back to the full frame.
+        """
+        self.boxes += (dx, dy, dx, dy)
+        return self
+
+    def __len__(self):
+        return len(self.scores)
+
+    def __repr__(self):
+        return f"Detections(n={len(self)})"
@@ -1,27 +1,176 @@
+import argparse
+import logging
+from pathlib import Path
+
 import cv2
+from computer_vision.gating import MotionGate
+from computer_vision.motion import MotionDetector
+from utils import metrics
 from utils.camera import CameraManager
+from utils.display import create_display
+from utils.frame_source import create_source
+from utils.logger import setup_logging
+from utils.pipeline import Pipeline
+from ml.yolo import config
 from ml.yolo.detect_onnx import YOLODetector
+from ml.yolo.detections import Detections
+from ml.yolo.render import draw_detections
+from ml.yolo.tracker import LineCounter, Tracker
 
 
-def main():
-    detector = YOLODetector(
-        model_path="ml/yolo/models/yolov8n.onnx",
-        conf_threshold=0.5
+def parse_args():
+    parser = argparse.ArgumentParser(description="YOLOv8 ONNX detection")
+    parser.add_argument(
+        "--headless",
+        action="store_true",
+        help="No window, only log detections (frames are still drawn for --stream)"
+    )
+    parser.add_argument(
+        "--source",
+        default="picamera",
+        help="picamera, video:<path>, images:<dir> or synthetic[:<frames>]"
+    )
+    parser.add_argument(
+        "--realtime",
+        action="store_true",
+        help="Replay file sources at their nominal FPS"
+    )
+    parser.add_argument(
+        "--gated",
+        action="store_true",
+        help="Run YOLO only while the motion detector sees movement"
+    )
+    parser.add_argument(
+        "--track",
+        action="store_true",
+        help="Track objects across frames and count unique ones"
     )
+    parser.add_argument(
+        "--detect-every",
+        type=int,
+        default=config.DETECT_EVERY,
+        help="With --track, run YOLO every N frames and predict boxes in between"
+    )
+    parser.add_argument(
+        "--line",
+        help="With --track, count crossings of the line x1,y1,x2,y2"
+    )
+    parser.add_argument(
+        "--stream",
+        type=int,
+        metavar="PORT",
+        help="Serve the annotated frames as MJPEG on this port instead of a window"
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        metavar="PORT",
+        help="Serve Prometheus metrics at /metrics on this port (also on the --stream port)"
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    setup_logging(Path("logs") / "yolo.log")
+
+    detector = YOLODetector(model_path=config.MODEL_PATH)
+
+    detect = detector.detect
+    gate = None
+    if args.gated:
+        gate = MotionGate(
+            MotionDetector(scale=config.GATE_MOTION_SCALE, min_area=config.GATE_MIN_AREA),
+            hold_off=config.GATE_HOLD_OFF,
+            crop=config.GATE_CROP
+        )
+        detect = gate.wrap(detector.detect, Detections.empty, Detections.offset)
+
+    tracker = None
+    line = None
+    if args.track:
+        tracker = Tracker(
+            iou_threshold=config.TRACK_IOU_THRESHOLD,
+            min_hits=config.TRACK_MIN_HITS,
+            max_misses=config.TRACK_MAX_MISSES
+        )
+        if args.line:
+            x1, y1, x2, y2 = (int(v) for v in args.line.split(","))
+            line = LineCounter((x1, y1), (x2, y2))
+
+        detect_frame = detect
+        frame_index = 0
+
+        def track(frame):
+            nonlocal frame_index
+            if frame_index % args.detect_every == 0:
+                tracks = tracker.update(detect_frame(frame))
+            else:
+                tracks = tracker.predict()
+            frame_index += 1
+
+            if line:
+                line.update(tracks)
+            return tracks
+
+        detect = track
+
+    # --headless only drops the window, a headless node can still stream
+    display = None
+    if args.stream is not None or not args.headless:
+        display = create_display("YOLO ONNX", args.stream)
+    if args.metrics_port:
+        metrics.serve(args.metrics_port)
+    draw_timer = metrics.stage_timer("draw")
+    last_labels = set()
+
+    def output(frame, detections):
+        nonlocal last_labels
+
+        # Log only when the set of visible classes changes
+        labels = {detector.class_names[i] for i in detections.class_ids}
+        if labels != last_labels:
+            logging.info(f"Detected: {', '.join(sorted(labels)) or 'nothing'}")
+            last_labels = labels
 
-    with CameraManager(resolution=(640, 480)) as camera:
+        if display is None:
+            return True
+        # Nothing to draw while no stream client is watching
+        if not display.wants():
+            return display.show(frame)
 
-        while True:
-            frame = camera.capture_array()
+        with draw_timer.time():
+            draw_detections(frame, detections, detector.class_names)
+            if line:
+                cv2.line(frame, tuple(line.p1.astype(int)), tuple(line.p2.astype(int)), (0, 0, 255), 2)
+                cv2.putText(
+                    frame,
+                    f"in {line.crossed['in']} | out {line.crossed['out']}",
+                    (20, 40),
+                    cv2.FONT_HERSHEY_SIMPLEX,
+                    0.8,
+                    (0, 0, 255),
+                    2
+                )
+        return display.show(frame)
 
-            frame = detector.detect(frame)
+    source = create_source(args.source, (640, 480), realtime=args.realtime)
 
-            cv2.imshow("YOLO ONNX", frame)
+    try:
+        with metrics.Reporter(config.METRICS_INTERVAL), CameraManager(source=source) as camera:
+            Pipeline(camera, detect, output).run()
+    finally:
+        if display:
+            display.close()
 
-            if cv2.waitKey(1) == 27:
-                break
+    if gate:
+        gate.log_stats()
 
-    cv2.destroyAllWindows()
+    if tracker:
+        counts = {detector.class_names[i]: n for i, n in tracker.counts.most_common()}
+        logging.info(f"Unique objects: {counts or 'none'}")
+    if line:
+        logging.info(f"Line crossings: {line.crossed}")
 
 
 if __name__ == "__main__":
@@ -2,13 +2,29 @@ import cv2
 from ultralytics import YOLO
 
 from utils.camera import CameraManager
+from ml.yolo.detections import Detections
+from ml.yolo.render import draw_detections
+from ml.yolo.tracker import Tracker
 
 
 MODEL_PATH = "/home/maksim/raspberry-pi-vision-lab/ml/yolo/models/mandarin.pt"
 
+# Run the model every DETECT_EVERY frames, the tracker predicts in between
+DETECT_EVERY = 3
+
+def to_detections(result):
+    boxes = result.boxes
+    return Detections(
+        boxes.xyxy.cpu().numpy(),
+        boxes.conf.cpu().numpy(),
+        boxes.cls.cpu().numpy().astype(int)
+    )
+
 def main():
 
     model = YOLO(MODEL_PATH)
+    tracker = Tracker()
+    frame_index = 0
 
     with CameraManager(resolution=(640, 480)) as camera:
 
@@ -16,16 +32,19 @@ def main():
 
             frame = camera.capture_array()
 
-            results = model(frame)
-
-            annotated = results[0].plot()
+            if frame_index % DETECT_EVERY == 0:
+                results = model(frame, verbose=False)
+                tracks = tracker.update(to_detections(results[0]))
+            else:
+                tracks = tracker.predict()
+            frame_index += 1
 
-            boxes = results[0].boxes
-            count = len(boxes)
+            draw_detections(frame, tracks, model.names)
 
+            # Visible now vs. unique mandarins seen so far
             cv2.putText(
-                annotated,
-                f"Mandarins: {count}",
+                frame,
+                f"Mandarins: {len(tracks)} (total {tracker.total})",
                 (20, 40),
                 cv2.FONT_HERSHEY_SIMPLEX,
                 1,
@@ -33,7 +52,7 @@ def main():
                 2
             )
 
-            cv2.imshow("Mandarin Detector", annotated)
+            cv2.imshow("Mandarin Detector", frame)
 
             if cv2.waitKey(1) & 0xFF == 27:
                 break
@@ -0,0 +1,89 @@
+import argparse
+import json
+import logging
+import time
+from pathlib import Path
+
+from utils.frame_source import EndOfStream, VideoFileSource
+from utils.logger import setup_logging
+from ml.yolo import config
+from ml.yolo.detect_onnx import YOLODetector
+
+
+def read_batch(source, batch_size):
+    """
+    Read up to batch_size frames, returns (frames, timestamps).
+    A short or empty batch means the video has ended.
+    """
+    frames = []
+    timestamps = []
+
+    for _ in range(batch_size):
+        try:
+            frame, timestamp = source.read()
+        except EndOfStream:
+            break
+        frames.append(frame)
+        timestamps.append(timestamp)
+
+    return frames, timestamps
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Run YOLOv8 ONNX detection over a recorded video in batches"
+    )
+    parser.add_argument("video", help="Input video file")
+    parser.add_argument("--model", default=str(config.MODEL_PATH))
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--conf", type=float, default=config.CONF_THRESHOLD)
+    parser.add_argument(
+        "--output",
+        help="JSON lines file with one record per frame (default: <video>.detections.jsonl)"
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    setup_logging(Path("logs") / "yolo_offline.log")
+
+    output_path = Path(args.output or f"{args.video}.detections.jsonl")
+
+    detector = YOLODetector(model_path=args.model, conf_threshold=args.conf)
+
+    if not detector.dynamic_batch:
+        logging.warning(
+            "Model has a fixed batch size, frames will be processed one by one. "
+            "Export it with a dynamic batch axis for batched inference."
+        )
+
+    frame_index = 0
+    start = time.perf_counter()
+
+    with VideoFileSource(args.video) as source, open(output_path, "w") as out:
+        while True:
+            frames, timestamps = read_batch(source, args.batch_size)
+            if not frames:
+                break
+
+            for detections, timestamp in zip(detector.detect_batch(frames), timestamps):
+                record = {
+                    "frame": frame_index,
+                    "timestamp": round(timestamp, 3),
+                    "boxes": detections.boxes.astype(float).round(1).tolist(),
+                    "scores": detections.scores.astype(float).round(3).tolist(),
+                    "labels": [detector.class_names[i] for i in detections.class_ids],
+                }
+                out.write(json.dumps(record) + "\n")
+                frame_index += 1
+
+    elapsed = time.perf_counter() - start
+    logging.info(
+        f"Processed {frame_index} frames in {elapsed:.1f}s "
+        f"({frame_index / max(elapsed, 1e-9):.1f} FPS), saved: {output_path}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+import cv2
+import numpy as np
+
+# Gray padding used by Ultralytics letterboxing
+PAD_VALUE = 114
+
+
+class LetterboxPreprocessor:
+    """
+    Letterbox preprocessing into a preallocated NCHW float32 tensor.
+
+    The frame is resized keeping its aspect ratio and centered on a padded
+    square canvas. Color swap, normalization and HWC -> CHW layout are done
+    in a single NumPy call writing straight into the reused input buffer,
+    so no per-frame intermediate arrays are allocated.
+    """
+
+    def __init__(self, img_size: int = 640, batch_size: int = 1):
+        self.img_size = img_size
+
+        # Reused model input tensor, padding is filled once
+        self.input_tensor = np.empty(
+            (batch_size, 3, img_size, img_size), dtype=np.float32
+        )
+        self.single_tensor = self.input_tensor[:1]
+
+        self.frame_shape = None
+        self.scale = 1.0
+        self.pad = (0, 0)
+        self._resized = None
+        self._window = None
+
+        # Geometry and resize buffer per frame shape, e.g. the few crop
+        # sizes of a MotionGate, so switching between them allocates nothing
+        self._geometries = {}
+
+    def _geometry(self, frame_shape):
+        h, w = frame_shape[:2]
+        scale = min(self.img_size / h, self.img_size / w)
+        new_w, new_h = round(w * scale), round(h * scale)
+        left = (self.img_size - new_w) // 2
+        top = (self.img_size - new_h) // 2
+
+        # Resize target is only needed when the frame is not already in scale
+        resized = None
+        if (new_h, new_w) != (h, w):
+            resized = np.empty((new_h, new_w, 3), dtype=np.uint8)
+
+        window = (
+            slice(None),
+            slice(top, top + new_h),
+            slice(left, left + new_w)
+        )
+        return scale, (left, top), resized, window
+
+    def _configure(self, frame_shape):
+        """
+        Switch the letterbox geometry to a new frame size.
+        """
+        if frame_shape not in self._geometries:
+            self._geometries[frame_shape] = self._geometry(frame_shape)
+
+        # Outside the previous image area the tensor is still padding,
+        # only that area needs resetting
+        if self._window is None:
+            self.input_tensor.fill(PAD_VALUE / 255.0)
+        else:
+            self.input_tensor[:, :, self._window[1], self._window[2]] = PAD_VALUE / 255.0
+
+        self.frame_shape = frame_shape
+        self.scale, self.pad, self._resized, self._window = self._geometries[frame_shape]
+
+    def reserve(self, batch_size: int):
+        """
+        Grow the input tensor to hold at least batch_size frames.
+        """
+        if batch_size > self.input_tensor.shape[0]:
+            self.input_tensor = np.empty(
+                (batch_size, 3, self.img_size, self.img_size), dtype=np.float32
+            )
+            self.single_tensor = self.input_tensor[:1]
+
+            # Force the padding to be refilled on the next frame
+            self.frame_shape = None
+            self._window = None
+
+    def __call__(self, frame, index: int = 0):
+        """
+        Write a letterboxed frame into the input tensor at the given batch
+        index. Returns the (1, 3, H, W) view of the first batch item, the
+        same object on every call.
+        """
+        if frame.shape != self.frame_shape:
+            self._configure(frame.shape)
+
+        img = frame
+        if self._resized is not None:
+            img = cv2.resize(
+                frame,
+                (self._resized.shape[1], self._resized.shape[0]),
+                dst=self._resized,
+                interpolation=cv2.INTER_LINEAR
+            )
+
+        # RGB <-> BGR swap, HWC -> CHW and 0..1 scaling in one pass
+        np.multiply(
+            img.transpose(2, 0, 1)[::-1],
+            np.float32(1.0 / 255.0),
+            out=self.input_tensor[index][self._window],
+            casting="unsafe"
+        )
+
+        return self.single_tensor
+
+    def restore_boxes(self, boxes):
+        """
+        Map (x1, y1, x2, y2) boxes from model input pixels back to frame
+        pixels in place (inverse letterbox transform).
+        """
+        h, w = self.frame_shape[:2]
+        left, top = self.pad
+
+        # Strided views keep the x and y columns in the same buffer
+        xs = boxes[:, 0::2]
+        ys = boxes[:, 1::2]
+
+        xs -= left
+        ys -= top
+        boxes /= self.scale
+
+        np.clip(xs, 0, w, out=xs)
+        np.clip(ys, 0, h, out=ys)
+        return boxes
@@ -0,0 +1,123 @@
+import argparse
+import random
+from pathlib import Path
+
+import cv2
+import onnx
+from onnxruntime.quantization import (
+    CalibrationDataReader,
+    CalibrationMethod,
+    QuantFormat,
+    QuantType,
+    quantize_static,
+)
+from onnxruntime.quantization.shape_inference import quant_pre_process
+
+from ml.yolo import config
+from ml.yolo.preprocess import LetterboxPreprocessor
+from utils.frame_source import IMAGE_EXTENSIONS
+
+# YOLOv8 Detect head, its box/class outputs are sensitive to INT8 error
+HEAD_PREFIX = "/model.22/"
+
+
+class ImageCalibrationReader(CalibrationDataReader):
+    """
+    Feeds calibration images through the same letterbox preprocessing
+    the detector uses at runtime.
+    """
+
+    def __init__(self, image_paths, input_name, img_size=640):
+        self.image_paths = list(image_paths)
+        self.input_name = input_name
+        self.preprocessor = LetterboxPreprocessor(img_size)
+        self._index = 0
+
+    def get_next(self):
+        if self._index >= len(self.image_paths):
+            return None
+
+        frame = cv2.imread(str(self.image_paths[self._index]))
+        self._index += 1
+
+        # The preprocessor reuses its buffer, the calibrator may keep the array
+        return {self.input_name: self.preprocessor(frame).copy()}
+
+    def rewind(self):
+        self._index = 0
+
+
+def head_nodes(model_path):
+    model = onnx.load(str(model_path))
+    return [node.name for node in model.graph.node if node.name.startswith(HEAD_PREFIX)]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Static INT8 quantization of the YOLOv8 ONNX model")
+    parser.add_argument("--model", default=str(config.MODEL_PATH))
+    parser.add_argument("--output", default=str(config.INT8_MODEL_PATH))
+    parser.add_argument(
+        "--calibration-dir",
+        default=str(config.CALIBRATION_DIR),
+        help="Images collected with ml/yolo/collect_dataset.py"
+    )
+    parser.add_argument("--max-images", type=int, default=200)
+    parser.add_argument(
+        "--method",
+        choices=["minmax", "entropy", "percentile"],
+        default="minmax"
+    )
+    parser.add_argument(
+        "--quantize-head",
+        action="store_true",
+        help="Also quantize the Detect head (faster, usually less accurate)"
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    images = sorted(
+        p for p in Path(args.calibration_dir).iterdir()
+        if p.suffix.lower() in IMAGE_EXTENSIONS
+    )
+    if not images:
+        print(f"No calibration images in {args.calibration_dir}")
+        return
+
+    random.Random(0).shuffle(images)
+    images = images[:args.max_images]
+    print(f"Calibrating on {len(images)} images")
+
+    # Shape inference and graph cleanup recommended before quantization
+    prepared_path = Path(args.output).with_suffix(".prep.onnx")
+    quant_pre_process(args.model, str(prepared_path))
+
+    model = onnx.load(str(prepared_path))
+    input_name = model.graph.input[0].name
+
+    methods = {
+        "minmax": CalibrationMethod.MinMax,
+        "entropy": CalibrationMethod.Entropy,
+        "percentile": CalibrationMethod.Percentile,
+    }
+
+    quantize_static(
+        str(prepared_path),
+        args.output,
+        ImageCalibrationReader(images, input_name),
+        quant_format=QuantFormat.QDQ,
+        activation_type=QuantType.QUInt8,
+        weight_type=QuantType.QInt8,
+        per_channel=True,
+        calibrate_method=methods[args.method],
+        nodes_to_exclude=[] if args.quantize_head else head_nodes(prepared_path),
+    )
+    prepared_path.unlink()
+
+    print(f"INT8 model saved: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+import cv2
+
+
+def draw_detections(frame, detections, class_names, color=(0, 255, 0)):
+    """
+    Draw boxes and "label score" captions on the frame in place.
+    Tracks from ml/yolo/tracker.py are captioned "label #id" instead.
+    """
+    ids = getattr(detections, "ids", None)
+
+    for i, ((x1, y1, x2, y2), score, class_id) in enumerate(zip(
+        detections.boxes.astype(int),
+        detections.scores,
+        detections.class_ids
+    )):
+        label = class_names[class_id]
+        caption = f"{label} #{ids[i]}" if ids is not None else f"{label} {score:.2f}"
+
+        cv2.rectangle(
+            frame,
+            (x1, y1),
+            (x2, y2),
+            color,
+            2
+        )
+
+        cv2.putText(
+            frame,
+            caption,
+            (x1, y1 - 10),
+            cv2.FONT_HERSHEY_SIMPLEX,
+            0.5,
+            color,
+            2
+        )
+
+    return frame
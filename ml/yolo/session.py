@@ -0,0 +1,86 @@
+import logging
+import time
+from pathlib import Path
+
+import onnxruntime as ort
+
+from ml.yolo import config
+
+GRAPH_OPTIMIZATION_LEVELS = {
+    "disable": ort.GraphOptimizationLevel.ORT_DISABLE_ALL,
+    "basic": ort.GraphOptimizationLevel.ORT_ENABLE_BASIC,
+    "extended": ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED,
+    "all": ort.GraphOptimizationLevel.ORT_ENABLE_ALL,
+}
+
+EXECUTION_MODES = {
+    "sequential": ort.ExecutionMode.ORT_SEQUENTIAL,
+    "parallel": ort.ExecutionMode.ORT_PARALLEL,
+}
+
+
+def default_session_options():
+    """
+    Session settings from ml/yolo/config.py as a dict of overridable values.
+    """
+    return {
+        "providers": list(config.PROVIDERS),
+        "intra_op_threads": config.INTRA_OP_THREADS,
+        "inter_op_threads": config.INTER_OP_THREADS,
+        "execution_mode": config.EXECUTION_MODE,
+        "graph_optimization": config.GRAPH_OPTIMIZATION,
+        "enable_mem_arena": config.ENABLE_MEM_ARENA,
+        "cache_optimized_model": config.CACHE_OPTIMIZED_MODEL,
+    }
+
+
+def optimized_model_path(model_path, graph_optimization):
+    """
+    Cache file for the optimized graph, e.g. yolov8n.opt-all.onnx
+    """
+    model_path = Path(model_path)
+    return model_path.with_name(f"{model_path.stem}.opt-{graph_optimization}.onnx")
+
+
+def create_session(model_path, **overrides):
+    """
+    Create a tuned ort.InferenceSession.
+    Any key of default_session_options() can be overridden.
+    """
+    options = default_session_options()
+    unknown = set(overrides) - set(options)
+    if unknown:
+        raise ValueError(f"Unknown session options: {', '.join(sorted(unknown))}")
+    options.update(overrides)
+
+    so = ort.SessionOptions()
+    so.intra_op_num_threads = options["intra_op_threads"]
+    so.inter_op_num_threads = options["inter_op_threads"]
+    so.execution_mode = EXECUTION_MODES[options["execution_mode"]]
+    so.enable_cpu_mem_arena = options["enable_mem_arena"]
+    so.graph_optimization_level = GRAPH_OPTIMIZATION_LEVELS[options["graph_optimization"]]
+
+    load_path = Path(model_path)
+
+    if options["cache_optimized_model"] and options["graph_optimization"] != "disable":
+        cache_path = optimized_model_path(model_path, options["graph_optimization"])
+
+        if cache_path.exists() and cache_path.stat().st_mtime >= load_path.stat().st_mtime:
+            # Already optimized, skip the optimization passes at startup
+            load_path = cache_path
+            so.graph_optimization_level = GRAPH_OPTIMIZATION_LEVELS["disable"]
+        else:
+            so.optimized_model_filepath = str(cache_path)
+
+    start = time.perf_counter()
+    session = ort.InferenceSession(
+        str(load_path),
+        sess_options=so,
+        providers=options["providers"]
+    )
+    logging.info(
+        f"Loaded {load_path.name} in {(time.perf_counter() - start) * 1000:.0f} ms "
+        f"(threads={options['intra_op_threads']}, opt={options['graph_optimization']})"
+    )
+
+    return session
@@ -0,0 +1,290 @@
+from collections import Counter
+
+import numpy as np
+
+from ml.yolo.detections import Detections
+from utils.boxes import box_iou
+
+try:
+    from scipy.optimize import linear_sum_assignment
+except ImportError:
+    linear_sum_assignment = None
+
+
+def boxes_to_states(boxes):
+    """
+    (N, 4) xyxy boxes -> (N, 4) [cx, cy, area, aspect ratio]
+    """
+    w = boxes[:, 2] - boxes[:, 0]
+    h = boxes[:, 3] - boxes[:, 1]
+    return np.stack([
+        boxes[:, 0] + w / 2,
+        boxes[:, 1] + h / 2,
+        w * h,
+        w / np.maximum(h, 1e-6)
+    ], axis=1)
+
+
+def states_to_boxes(states):
+    """
+    (N, >=4) [cx, cy, area, aspect ratio, ...] -> (N, 4) xyxy boxes
+    """
+    area = np.maximum(states[:, 2], 0)
+    w = np.sqrt(area * np.maximum(states[:, 3], 0))
+    h = area / np.maximum(w, 1e-6)
+    return np.stack([
+        states[:, 0] - w / 2,
+        states[:, 1] - h / 2,
+        states[:, 0] + w / 2,
+        states[:, 1] + h / 2
+    ], axis=1).astype(np.float32)
+
+
+def assign(iou, iou_threshold):
+    """
+    Match rows (tracks) to columns (detections) maximising total IoU.
+    Hungarian assignment when scipy is available, otherwise greedy by
+    best IoU first. Returns (rows, cols) of pairs over the threshold.
+    """
+    if iou.size == 0:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+
+    if linear_sum_assignment is not None:
+        rows, cols = linear_sum_assignment(-iou)
+    else:
+        rows, cols = [], []
+        used_rows, used_cols = set(), set()
+        for flat in np.argsort(-iou, axis=None):
+            r, c = divmod(int(flat), iou.shape[1])
+            if iou[r, c] < iou_threshold:
+                break
+            if r in used_rows or c in used_cols:
+                continue
+            used_rows.add(r)
+            used_cols.add(c)
+            rows.append(r)
+            cols.append(c)
+        rows, cols = np.array(rows, dtype=np.intp), np.array(cols, dtype=np.intp)
+
+    keep = iou[rows, cols] >= iou_threshold
+    return rows[keep], cols[keep]
+
+
+class KalmanBoxFilter:
+    """
+    Constant-velocity Kalman filter for all tracks at once, as in SORT:
+    state [cx, cy, area, aspect, vx, vy, v_area], measurement the first four.
+    States are (N, 7) and covariances (N, 7, 7), predict and update are
+    batched matrix operations over every track.
+    """
+
+    F = np.eye(7, dtype=np.float64)
+    F[0, 4] = F[1, 5] = F[2, 6] = 1
+
+    H = np.eye(4, 7, dtype=np.float64)
+
+    P0 = np.diag([10, 10, 10, 10, 1e4, 1e4, 1e4]).astype(np.float64)
+    Q = np.diag([1, 1, 1, 1, 1e-2, 1e-2, 1e-4]).astype(np.float64)
+    R = np.diag([1, 1, 10, 10]).astype(np.float64)
+
+    def __init__(self):
+        self.x = np.empty((0, 7))
+        self.P = np.empty((0, 7, 7))
+
+    def add(self, boxes):
+        x = np.zeros((len(boxes), 7))
+        x[:, :4] = boxes_to_states(boxes)
+        self.x = np.concatenate([self.x, x])
+        self.P = np.concatenate([self.P, np.repeat(self.P0[None], len(boxes), axis=0)])
+
+    def keep(self, mask):
+        self.x = self.x[mask]
+        self.P = self.P[mask]
+
+    def predict(self):
+        # Area can't shrink below zero
+        shrinking = self.x[:, 2] + self.x[:, 6] <= 0
+        self.x[shrinking, 6] = 0
+
+        self.x = self.x @ self.F.T
+        self.P = self.F @ self.P @ self.F.T + self.Q
+
+    def update(self, index, boxes):
+        if not len(index):
+            return
+
+        x = self.x[index]
+        P = self.P[index]
+
+        y = boxes_to_states(boxes) - x @ self.H.T
+        S = self.H @ P @ self.H.T + self.R
+        K = P @ self.H.T @ np.linalg.inv(S)
+
+        self.x[index] = x + np.einsum("nij,nj->ni", K, y)
+        self.P[index] = (np.eye(7) - K @ self.H) @ P
+
+    def boxes(self):
+        return states_to_boxes(self.x)
+
+
+class Tracks(Detections):
+    """
+    Detections with a persistent track id per box.
+    """
+
+    __slots__ = ("ids",)
+
+    def __init__(self, boxes, scores, class_ids, ids):
+        super().__init__(boxes, scores, class_ids)
+        self.ids = ids
+
+
+class Tracker:
+    """
+    SORT-style multi-object tracker for YOLODetector output.
+
+    - update(detections) predicts every track, matches tracks to boxes of
+      the same class by IoU and corrects the matched filters
+    - predict() only moves tracks along their velocity, for frames where
+      the detector is skipped
+    - a track gets its id counted once it was matched `min_hits` times and
+      is dropped after `max_misses` detection rounds without a match
+    - counts holds unique confirmed objects per class id over the run
+    """
+
+    def __init__(self, iou_threshold: float = 0.3, min_hits: int = 3, max_misses: int = 3):
+        self.iou_threshold = iou_threshold
+        self.min_hits = min_hits
+        self.max_misses = max_misses
+
+        self.kalman = KalmanBoxFilter()
+        self.ids = np.empty(0, dtype=np.int64)
+        self.class_ids = np.empty(0, dtype=np.int64)
+        self.scores = np.empty(0, dtype=np.float32)
+        self.hits = np.empty(0, dtype=np.int64)
+        self.misses = np.empty(0, dtype=np.int64)
+        self.confirmed = np.empty(0, dtype=bool)
+
+        self._next_id = 1
+        self.counts = Counter()
+
+    @property
+    def total(self):
+        return sum(self.counts.values())
+
+    def update(self, detections):
+        self.kalman.predict()
+
+        boxes = detections.boxes
+        iou = box_iou(self.kalman.boxes(), boxes)
+
+        # Only same-class pairs can match
+        iou[self.class_ids[:, None] != detections.class_ids[None, :]] = 0
+
+        rows, cols = assign(iou, self.iou_threshold)
+
+        self.kalman.update(rows, boxes[cols])
+        self.scores[rows] = detections.scores[cols]
+        self.hits[rows] += 1
+        self.misses += 1
+        self.misses[rows] = 0
+
+        newly_confirmed = ~self.confirmed & (self.hits >= self.min_hits)
+        self.confirmed |= newly_confirmed
+        self.counts.update(self.class_ids[newly_confirmed].tolist())
+
+        # Forget tracks that were not seen for too long
+        alive = self.misses <= self.max_misses
+        if not alive.all():
+            self._keep(alive)
+
+        # Unmatched detections start new tracks
+        new = np.ones(len(boxes), dtype=bool)
+        new[cols] = False
+        self._add(detections, new)
+
+        return self._visible()
+
+    def predict(self):
+        self.kalman.predict()
+        return self._visible()
+
+    def _keep(self, mask):
+        self.kalman.keep(mask)
+        for name in ("ids", "class_ids", "scores", "hits", "misses", "confirmed"):
+            setattr(self, name, getattr(self, name)[mask])
+
+    def _add(self, detections, mask):
+        n = int(mask.sum())
+        if not n:
+            return
+
+        self.kalman.add(detections.boxes[mask])
+        self.ids = np.concatenate([self.ids, np.arange(self._next_id, self._next_id + n)])
+        self.class_ids = np.concatenate([self.class_ids, detections.class_ids[mask]])
+        self.scores = np.concatenate([self.scores, detections.scores[mask]])
+        self.hits = np.concatenate([self.hits, np.ones(n, dtype=np.int64)])
+        self.misses = np.concatenate([self.misses, np.zeros(n, dtype=np.int64)])
+        self.confirmed = np.concatenate([self.confirmed, np.zeros(n, dtype=bool)])
+        self._next_id += n
+
+        # With min_hits=1 a track counts from its first detection
+        if self.min_hits <= 1:
+            self.confirmed[-n:] = True
+            self.counts.update(detections.class_ids[mask].tolist())
+
+    def _visible(self):
+        """
+        Confirmed tracks matched in the last detection round.
+        """
+        mask = self.confirmed & (self.misses == 0)
+        return Tracks(
+            self.kalman.boxes()[mask],
+            self.scores[mask],
+            self.class_ids[mask],
+            self.ids[mask]
+        )
+
+
+class LineCounter:
+    """
+    Counts tracks whose center crosses the line p1 -> p2, per direction.
+    For a vertical line drawn top to bottom, moving right counts as "out"
+    and moving left as "in"; swap p1 and p2 to flip them.
+
+    The side of a track is forgotten after `max_unseen` updates without it,
+    so memory stays bounded on counters running for days.
+    """
+
+    def __init__(self, p1, p2, max_unseen: int = 30):
+        self.p1 = np.asarray(p1, dtype=np.float32)
+        self.p2 = np.asarray(p2, dtype=np.float32)
+        self.max_unseen = max_unseen
+        self.sides = {}
+        self.last_seen = {}
+        self.crossed = {"in": 0, "out": 0}
+        self._updates = 0
+
+    def update(self, tracks):
+        centers = (tracks.boxes[:, :2] + tracks.boxes[:, 2:]) / 2
+        dx, dy = self.p2 - self.p1
+        # Sign of the cross product tells the side of the line
+        sides = np.sign(dx * (centers[:, 1] - self.p1[1]) - dy * (centers[:, 0] - self.p1[0]))
+
+        self._updates += 1
+        for track_id, side in zip(tracks.ids.tolist(), sides.tolist()):
+            self.last_seen[track_id] = self._updates
+            previous = self.sides.get(track_id)
+            if side and previous and side != previous:
+                self.crossed["in" if side > 0 else "out"] += 1
+            if side:
+                self.sides[track_id] = side
+
+        # Tracker ids are never reused, stale ones can go
+        if self._updates % self.max_unseen == 0:
+            stale = [i for i, seen in self.last_seen.items() if self._updates - seen > self.max_unseen]
+            for track_id in stale:
+                del self.last_seen[track_id]
+                self.sides.pop(track_id, None)
+
+        return self.crossed
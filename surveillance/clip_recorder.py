@@ -0,0 +1,275 @@
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from fractions import Fraction
+from pathlib import Path
+
+# Writer thread commands, everything else in the queue is packet data
+_OPEN = "open"
+_CLOSE = "close"
+_STOP = "stop"
+
+
+class ClipRecorder:
+    """
+    Keeps the last seconds of encoded H.264 in memory and turns motion
+    events into clips with pre-roll and post-roll.
+
+    - add_packet() is called by the encoder for every packet (any thread)
+    - the buffer always starts at a keyframe and covers at least
+      `pre_roll` seconds, older GOPs are dropped as new packets arrive
+    - trigger() opens a clip with the buffered packets, or extends the
+      running one, it ends `post_roll` seconds after the last trigger and
+      never runs longer than `max_length` seconds
+    - files are written by a background thread, nothing touches the disk
+      between events
+
+    Packets need SPS/PPS repeated on every keyframe (H264Encoder(repeat=True))
+    so a clip can start at any GOP.
+    """
+
+    def __init__(self, output_dir, pre_roll: float = 5.0, post_roll: float = 10.0, max_length: float = 60.0):
+        self.output_dir = Path(output_dir)
+        self.pre_roll = pre_roll
+        self.post_roll = post_roll
+        self.max_length = max_length
+
+        # (data, keyframe, timestamp in seconds)
+        self._packets = deque()
+        self._keyframes = deque()
+        self._buffered_bytes = 0
+        self._last_timestamp = None
+
+        self._clip_start = None
+        self._clip_end = None
+        self._lock = threading.Lock()
+
+        self._queue = queue.Queue()
+        self._thread = None
+
+        self.stats = {
+            "packets": 0,
+            "clips": 0,
+            "written_bytes": 0,
+            "errors": 0,
+        }
+
+    def start(self):
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self._thread = threading.Thread(target=self._writer, name="clip-writer", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        Finish the running clip and wait for the writer.
+        """
+        with self._lock:
+            if self._clip_end is not None:
+                self._queue.put((_CLOSE, None))
+                self._clip_end = None
+
+        if self._thread:
+            self._queue.put((_STOP, None))
+            self._thread.join()
+            self._thread = None
+
+        logging.info(f"Clip recorder stats: {self.stats}")
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    @property
+    def buffered_seconds(self):
+        with self._lock:
+            if not self._packets:
+                return 0.0
+            return self._packets[-1][2] - self._packets[0][2]
+
+    @property
+    def buffered_bytes(self):
+        return self._buffered_bytes
+
+    @property
+    def recording(self):
+        return self._clip_end is not None
+
+    def add_packet(self, data, keyframe: bool, timestamp: float):
+        """
+        Add one encoded packet. `data` must not be modified afterwards.
+        """
+        with self._lock:
+            self.stats["packets"] += 1
+            self._last_timestamp = timestamp
+
+            if self._clip_end is not None:
+                if timestamp > self._clip_end:
+                    self._queue.put((_CLOSE, None))
+                    self._clip_end = None
+                else:
+                    self._queue.put(data)
+
+            # A buffer starting mid-GOP can't be decoded
+            if not self._packets and not keyframe:
+                return
+
+            self._packets.append((data, keyframe, timestamp))
+            if keyframe:
+                self._keyframes.append(timestamp)
+            self._buffered_bytes += len(data)
+            self._trim(timestamp - self.pre_roll)
+
+    def _trim(self, cutoff):
+        """
+        Drop the oldest GOP while the next one alone still reaches back
+        to `cutoff`.
+        """
+        packets = self._packets
+        keyframes = self._keyframes
+
+        while len(keyframes) > 1 and keyframes[1] <= cutoff:
+            keyframes.popleft()
+            self._buffered_bytes -= len(packets.popleft()[0])
+            while not packets[0][1]:
+                self._buffered_bytes -= len(packets.popleft()[0])
+
+    def trigger(self):
+        """
+        Start a clip with the buffered pre-roll or extend the running one.
+        Returns the path of a newly opened clip, otherwise None.
+        """
+        with self._lock:
+            if self._last_timestamp is None or not self._packets:
+                return None
+
+            path = None
+            if self._clip_end is None:
+                timestamp = time.strftime("%Y%m%d_%H%M%S")
+                path = self.output_dir / f"clip_{timestamp}.h264"
+
+                self._queue.put((_OPEN, path))
+                for data, _, _ in self._packets:
+                    self._queue.put(data)
+
+                self._clip_start = self._packets[0][2]
+
+            self._clip_end = min(
+                self._last_timestamp + self.post_roll,
+                self._clip_start + self.max_length
+            )
+            return path
+
+    def _writer(self):
+        f = None
+
+        while True:
+            item = self._queue.get()
+
+            if isinstance(item, tuple):
+                command, path = item
+
+                if f is not None and command in (_CLOSE, _STOP, _OPEN):
+                    f.close()
+                    f = None
+
+                if command == _STOP:
+                    break
+
+                if command == _OPEN:
+                    try:
+                        f = open(path, "wb")
+                        self.stats["clips"] += 1
+                        logging.info(f"Recording clip: {path}")
+                    except OSError as e:
+                        self.stats["errors"] += 1
+                        logging.error(f"Can't create clip {path}: {e}")
+                continue
+
+            if f is None:
+                continue
+
+            try:
+                f.write(item)
+                self.stats["written_bytes"] += len(item)
+            except OSError as e:
+                self.stats["errors"] += 1
+                logging.error(f"Can't write clip {f.name}: {e}")
+                f.close()
+                f = None
+
+
+def start_camera_recording(camera, recorder, bitrate: int = 4_000_000, iperiod: int = 30):
+    """
+    Feed the hardware H.264 encoder of a running Picamera2 into the recorder.
+    Returns a function that stops the encoder.
+    """
+    from picamera2.encoders import H264Encoder
+    from picamera2.outputs import Output
+
+    class RingBufferOutput(Output):
+        def outputframe(self, frame, keyframe=True, timestamp=None, packet=None, audio=False):
+            # Encoder buffers are reused, keep a copy; timestamps are in us
+            if timestamp is None:
+                timestamp = time.monotonic() * 1e6
+            recorder.add_packet(bytes(frame), keyframe, timestamp / 1e6)
+
+    # repeat=True puts SPS/PPS in front of every keyframe, iperiod bounds
+    # how far back a clip may have to start
+    encoder = H264Encoder(bitrate=bitrate, repeat=True, iperiod=iperiod)
+    camera.start_encoder(encoder, RingBufferOutput())
+
+    return lambda: camera.stop_encoder(encoder)
+
+
+class SoftwareH264Encoder:
+    """
+    libx264 via PyAV with the same packet output as the camera encoder,
+    for running the recorder on video files or synthetic frames.
+    """
+
+    def __init__(self, recorder, resolution, fps: int = 30, bitrate: int = 2_000_000, iperiod: int = 30):
+        import av
+
+        self.recorder = recorder
+        self.fps = fps
+
+        self.codec = av.CodecContext.create("libx264", "w")
+        self.codec.width, self.codec.height = resolution
+        self.codec.pix_fmt = "yuv420p"
+        self.codec.time_base = Fraction(1, fps)
+        self.codec.framerate = Fraction(fps, 1)
+        self.codec.bit_rate = bitrate
+        self.codec.gop_size = iperiod
+        self.codec.options = {
+            "preset": "ultrafast",
+            "tune": "zerolatency",
+            "x264-params": f"repeat-headers=1:keyint={iperiod}:scenecut=0",
+        }
+
+        self._video_frame = av.VideoFrame
+        self._pts = 0
+        self._timestamps = {}
+
+    def encode(self, frame, timestamp: float):
+        """
+        Encode one BGR frame, packets go straight to the recorder.
+        """
+        video_frame = self._video_frame.from_ndarray(frame, format="bgr24")
+        video_frame.pts = self._pts
+        self._timestamps[self._pts] = timestamp
+        self._pts += 1
+
+        self._emit(self.codec.encode(video_frame))
+
+    def stop(self):
+        self._emit(self.codec.encode(None))
+
+    def _emit(self, packets):
+        for packet in packets:
+            timestamp = self._timestamps.pop(packet.pts, packet.pts / self.fps)
+            self.recorder.add_packet(bytes(packet), packet.is_keyframe, timestamp)
@@ -3,13 +3,60 @@ from pathlib import Path
 BASE_DIR = Path(__file__).resolve().parent.parent
 LOGS_DIR = BASE_DIR / "logs"
 EVENTS_DIR = BASE_DIR / "storage/events"
+CLIPS_DIR = BASE_DIR / "storage/clips"
 
 RESOLUTION = (640, 480)
 
+# Motion analysis runs on the Y plane of this YUV420 lores stream, the
+# RGB main stream is only fetched to display or save an event
+LORES_RESOLUTION = (320, 240)
+
 MIN_AREA = 1500
 
+# Further downscale of the lores plane (0.5 -> 160x120)
+MOTION_SCALE = 0.5
+
+# Regions of interest as polygons in main stream pixels, None watches everything
+# e.g. [[(0, 200), (640, 200), (640, 480), (0, 480)]]
+MOTION_ROI = None
+
+# Background model: static | previous_frame | running_average | mog2
+# previous_frame is the legacy frame-to-frame difference,
+# running_average adapts to lighting drift, mog2 also copes with
+# repetitive motion (leaves, water) at a higher CPU cost
+BACKGROUND_MODEL = "running_average"
+BACKGROUND_OPTIONS = {
+    "static": {"threshold": 25},
+    "previous_frame": {"threshold": 25},
+    "running_average": {"alpha": 0.05, "threshold": 25},
+    "mog2": {"history": 500, "var_threshold": 16, "detect_shadows": True},
+}
+
 LOG_FILE = LOGS_DIR / "security_camera.log"
 
 SAVE_IMAGES = True
+
+# Event images are encoded and written in background threads
+JPEG_QUALITY = 90
+WRITER_WORKERS = 2
+WRITER_QUEUE_SIZE = 8     # images beyond this are dropped, not waited for
+FSYNC_BATCH = 10          # fsync every N images, 0 leaves it to the OS
+
+# Event clips: the H.264 stream is kept in memory and only written when
+# there is motion, starting CLIP_PRE_ROLL seconds before the event
+RECORD_CLIPS = True
+CLIP_PRE_ROLL = 5
+CLIP_POST_ROLL = 10
+CLIP_MAX_LENGTH = 60
+CLIP_BITRATE = 4_000_000
+CLIP_IPERIOD = 30         # keyframe interval in frames, pre-roll granularity
+
+# Show the annotated preview window, disable on headless nodes
+SHOW_PREVIEW = True
+# Serve the preview as MJPEG on this port instead of a window (None: off)
+STREAM_PORT = None
+# Prometheus /metrics port (None: only on STREAM_PORT) and log summary interval
+METRICS_PORT = None
+METRICS_INTERVAL = 60
 COOLDOWN_SECONDS = 5
 
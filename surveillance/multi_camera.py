@@ -0,0 +1,170 @@
+import argparse
+import logging
+import os
+from functools import partial
+from pathlib import Path
+
+import cv2
+
+from utils import metrics
+from utils.display import create_display
+from utils.frame_source import create_source
+from utils.inference_pool import ProcessPool, SharedMemoryPool
+from utils.logger import setup_logging
+from utils.supervisor import Supervisor
+
+RESOLUTION = (640, 480)
+
+
+def yolo_worker(threads):
+    """
+    Runs in a worker process: one YOLODetector per process.
+    """
+    from ml.yolo import config
+    from ml.yolo.detect_onnx import YOLODetector
+
+    detector = YOLODetector(
+        model_path=config.MODEL_PATH,
+        session_options={"intra_op_threads": threads}
+    )
+    return detector.detect
+
+
+def face_worker(threads):
+    """
+    Runs in a worker process: detection, embedding and gallery match.
+    Returns a list of (box, label) pairs.
+    """
+    from ml.face import config
+    from ml.face.ann import create_index
+    from ml.face.engine import get_engine
+    from ml.face.gallery import load_gallery
+
+    engine = get_engine(threads=threads)
+    gallery = load_gallery(
+        config.GALLERY_PATH,
+        config.KNOWN_DIR,
+        index=create_index(config.INDEX, **config.INDEX_OPTIONS[config.INDEX]),
+        save=False
+    )
+
+    def detect(frame):
+        bboxes, embeddings = engine.analyze(frame)
+        if not len(bboxes):
+            return []
+
+        matches = gallery.match(embeddings, config.THRESHOLD)
+        return [
+            (bbox[:4].astype(int), f"{name} ({score:.2f})" if name else "Unknown")
+            for bbox, (name, score) in zip(bboxes, matches)
+        ]
+
+    return detect
+
+
+WORKERS = {
+    "yolo": yolo_worker,
+    "face": face_worker,
+}
+
+
+def draw_faces(frame, results):
+    for box, label in results:
+        cv2.rectangle(frame, box[:2], box[2:], (0, 255, 0), 2)
+        cv2.putText(frame, label, (box[0], box[1] - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Several cameras or streams sharing a pool of detector processes"
+    )
+    parser.add_argument(
+        "--source",
+        action="append",
+        required=True,
+        help="Frame source, repeat per stream: picamera[:<num>], video:<path or URL>, images:<dir>, synthetic"
+    )
+    parser.add_argument("--detector", choices=sorted(WORKERS), default="yolo")
+    parser.add_argument("--workers", type=int, default=2, help="Detector processes")
+    parser.add_argument(
+        "--transport",
+        choices=["shm", "pickle"],
+        default="shm",
+        help="Pass frames to the workers through shared memory slots or by pickling"
+    )
+    parser.add_argument("--queue-size", type=int, default=2, help="Frames waiting per stream")
+    parser.add_argument("--realtime", action="store_true", help="Replay file sources at their nominal FPS")
+    parser.add_argument("--preview", action="store_true", help="One window per stream")
+    parser.add_argument(
+        "--stream",
+        type=int,
+        metavar="PORT",
+        help="Serve every stream as MJPEG on this port (/stream/<name>) instead of windows"
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        metavar="PORT",
+        help="Serve Prometheus metrics at /metrics on this port (also on the --stream port)"
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    setup_logging(Path("logs") / "multi_camera.log")
+
+    sources = {
+        f"{i}:{spec}": create_source(spec, RESOLUTION, realtime=args.realtime)
+        for i, spec in enumerate(args.source)
+    }
+
+    # Split the cores between the workers instead of oversubscribing them
+    threads = max(1, (os.cpu_count() or 4) // args.workers)
+    factory = partial(WORKERS[args.detector], threads)
+
+    if args.detector == "yolo":
+        from ml.yolo.detect_onnx import COCO_CLASSES
+        from ml.yolo.render import draw_detections
+        draw = partial(draw_detections, class_names=COCO_CLASSES)
+    else:
+        draw = draw_faces
+
+    display = None
+    if args.preview or args.stream:
+        display = create_display("Multi camera", args.stream)
+
+    if args.metrics_port:
+        metrics.serve(args.metrics_port)
+    draw_timer = metrics.stage_timer("draw")
+
+    last_counts = {}
+
+    def output(name, frame, result):
+        n = len(result)
+        if n != last_counts.get(name):
+            logging.info(f"Stream {name}: {n} detections")
+            last_counts[name] = n
+
+        if display is None or not display.wants(name):
+            return True
+
+        with draw_timer.time():
+            draw(frame, result)
+        return display.show(frame, name)
+
+    if args.transport == "shm":
+        pool = SharedMemoryPool(factory, workers=args.workers, max_frame_shape=(RESOLUTION[1], RESOLUTION[0], 3))
+    else:
+        pool = ProcessPool(factory, workers=args.workers)
+
+    try:
+        with pool, metrics.Reporter():
+            Supervisor(sources, pool, output, queue_size=args.queue_size).run()
+    finally:
+        if display:
+            display.close()
+
+
+if __name__ == "__main__":
+    main()
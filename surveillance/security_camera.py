@@ -2,9 +2,17 @@ import logging
 import cv2
 import time
 
+from utils import metrics
 from utils.logger import setup_logging
 from surveillance import config
+from computer_vision.background import create_background_model
+from computer_vision.motion import MotionDetector
+from surveillance.clip_recorder import ClipRecorder, start_camera_recording
 from utils.camera import CameraManager
+from utils.display import create_display
+from utils.event_writer import EventWriter
+from utils.pipeline import Pipeline
+
 
 def main():
     setup_logging(config.LOG_FILE)
@@ -12,60 +20,103 @@ def main():
 
     config.EVENTS_DIR.mkdir(exist_ok=True)
 
-    background = None
-    last_event_time = 0
-
-    with CameraManager(resolution=config.RESOLUTION) as camera:
-
-        while True:
-            frame = camera.capture_array()
-            gray = cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY)
-            gray = cv2.GaussianBlur(gray, (21, 21), 0)
+    background = create_background_model(
+        config.BACKGROUND_MODEL,
+        **config.BACKGROUND_OPTIONS[config.BACKGROUND_MODEL]
+    )
+    motion = MotionDetector(
+        scale=config.MOTION_SCALE,
+        min_area=config.MIN_AREA,
+        background=background,
+        roi=config.MOTION_ROI,
+        output_size=config.RESOLUTION
+    )
+
+    def process(frame):
+        return motion.detect(frame.analysis)
 
-            if background is None:
-                background = gray
-                continue
-
-            delta = cv2.absdiff(background, gray)
-            thresh = cv2.threshold(delta, 25, 255, cv2.THRESH_BINARY)[1]
-            thresh = cv2.dilate(thresh, None, iterations=2)
-
-            contours, _ = cv2.findContours(
-                thresh,
-                cv2.RETR_EXTERNAL,
-                cv2.CHAIN_APPROX_SIMPLE
+    last_event_time = 0
+    draw_timer = metrics.stage_timer("draw")
+
+    def output(frame, boxes):
+        nonlocal last_event_time
+
+        current_time = time.time()
+        is_event = bool(boxes) and (current_time - last_event_time > config.COOLDOWN_SECONDS)
+
+        if is_event:
+            logging.info("Motion detected")
+            last_event_time = current_time
+
+        # Every frame with motion keeps the clip going
+        if boxes and config.RECORD_CLIPS:
+            clip_path = clips.trigger()
+            if clip_path:
+                logging.info(f"Saving clip: {clip_path}")
+
+        save_event = is_event and config.SAVE_IMAGES
+
+        # Analysis used the lores plane, the main stream is only fetched
+        # when there is something to save or show
+        show = display is not None and display.wants()
+        if not (show or save_event):
+            return True
+
+        image = frame.main()
+
+        with draw_timer.time():
+            for (x, y, w, h) in boxes:
+                cv2.rectangle(image, (x, y), (x+w, y+h), (0, 0, 255), 2)
+
+        if save_event:
+            timestamp = time.strftime("%Y%m%d_%H%M%S")
+            image_path =config.EVENTS_DIR / f"motion_{timestamp}.jpg"
+            if writer.submit(image_path, image):
+                logging.info(f"Saving event: {image_path}")
+
+        if not show:
+            return True
+
+        return display.show(image)
+
+    writer = EventWriter(
+        workers=config.WRITER_WORKERS,
+        queue_size=config.WRITER_QUEUE_SIZE,
+        jpeg_quality=config.JPEG_QUALITY,
+        fsync_batch=config.FSYNC_BATCH
+    )
+
+    clips = ClipRecorder(
+        config.CLIPS_DIR,
+        pre_roll=config.CLIP_PRE_ROLL,
+        post_roll=config.CLIP_POST_ROLL,
+        max_length=config.CLIP_MAX_LENGTH
+    )
+
+    if config.METRICS_PORT:
+        metrics.serve(config.METRICS_PORT)
+
+    display = None
+    if config.SHOW_PREVIEW or config.STREAM_PORT:
+        display = create_display("Secutiry Camera", config.STREAM_PORT)
+
+    with writer, clips, metrics.Reporter(config.METRICS_INTERVAL), CameraManager(resolution=config.RESOLUTION, lores=config.LORES_RESOLUTION) as camera:
+        stop_recording = None
+        if config.RECORD_CLIPS:
+            stop_recording = start_camera_recording(
+                camera.camera,
+                clips,
+                bitrate=config.CLIP_BITRATE,
+                iperiod=config.CLIP_IPERIOD
             )
 
-            motion_detected = False
-
-            for contour in contours:
-                if cv2.contourArea(contour) < config.MIN_AREA:
-                    continue
-
-                motion_detected = True
-
-                (x, y, w, h) = cv2.boundingRect(contour)
-                cv2.rectangle(frame, (x, y), (x+w, y+h), (0, 0, 255), 2)
-
-            current_time = time.time()
-
-            if motion_detected and (current_time - last_event_time > config.COOLDOWN_SECONDS):
-                logging.info("Motion detected")
-
-                if config.SAVE_IMAGES:
-                    timestamp = time.strftime("%Y%m%d_%H%M%S")
-                    image_path =config.EVENTS_DIR / f"motion_{timestamp}.jpg"
-                    cv2.imwrite(str(image_path), frame)
-                    logging.info(f"Saved event: {image_path}")
-                
-                last_event_time = current_time
-            
-            cv2.imshow("Secutiry Camera", frame)
-
-            if cv2.waitKey(1) == 27:
-                break
-            
-    cv2.destroyAllWindows()
+        try:
+            Pipeline(camera, process, output, dual_stream=True).run()
+        finally:
+            if stop_recording:
+                stop_recording()
+            if display:
+                display.close()
 
 if __name__ == "__main__":
     main()
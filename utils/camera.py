@@ -1,32 +1,32 @@
-from picamera2 import Picamera2
-from libcamera import Transform
+from utils.frame_source import PicameraSource
 
 class CameraManager:
-    def __init__(self, resolution=(640, 480), hflip=True, vflip=True):
+    """
+    Context manager that starts a frame source and stops it on exit.
+    Defaults to the Raspberry Pi camera; pass any FrameSource (video file,
+    image directory, synthetic) to run the same code off-device.
+    lores=(w, h) enables the analysis stream used by capture_dual().
+    """
+
+    def __init__(self, resolution=(640, 480), hflip=True, vflip=True, source=None, lores=None):
         self.resolution = resolution
         self.hflip = hflip
         self.vflip = vflip
+        self.source = source
+        self.lores = lores
         self.camera = None
-    
-    def __enter__(self):
-        self.camera = Picamera2()
 
-        config = self.camera.create_preview_configuration(
-            main={
-                "format": "RGB888",
-                "size": self.resolution
-            },
-            transform=Transform(
-                hflip=int(self.hflip),
-                vflip=int(self.vflip)
-            )
-        )
+    def __enter__(self):
+        if self.source is None:
+            self.source = PicameraSource(self.resolution, self.hflip, self.vflip, self.lores)
+        elif self.lores:
+            self.source.lores_size = self.lores
 
-        self.camera.configure(config)
-        self.camera.start()
+        self.source.start()
+        self.camera = self.source
 
         return self.camera
-    
+
     def __exit__(self, exc_type, exc_val, exc_tb):
         if self.camera:
             self.camera.stop()
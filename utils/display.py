@@ -0,0 +1,56 @@
+import cv2
+
+from utils import metrics
+from utils.mjpeg_server import DEFAULT_STREAM, MJPEGServer
+
+
+class WindowDisplay:
+    """
+    cv2.imshow output, needs a desktop session.
+    show() returns False once one of `exit_keys` is pressed.
+    """
+
+    def __init__(self, title: str, exit_keys=(27,)):
+        self.title = title
+        self.exit_keys = exit_keys
+
+    def wants(self, name: str = None) -> bool:
+        return True
+
+    def show(self, frame, name: str = None) -> bool:
+        cv2.imshow(name or self.title, frame)
+        return cv2.waitKey(1) not in self.exit_keys
+
+    def close(self):
+        cv2.destroyAllWindows()
+
+
+class StreamDisplay:
+    """
+    MJPEG over HTTP output for headless Pis, see utils/mjpeg_server.py.
+    wants(name) is False while nobody watches, so callers can skip drawing.
+    The same server answers /metrics.
+    """
+
+    def __init__(self, server: MJPEGServer):
+        self.server = server.start()
+        metrics.serve(server=self.server)
+
+    def wants(self, name: str = None) -> bool:
+        return self.server.has_clients(name or DEFAULT_STREAM)
+
+    def show(self, frame, name: str = None) -> bool:
+        self.server.publish(frame, name or DEFAULT_STREAM)
+        return True
+
+    def close(self):
+        self.server.stop()
+
+
+def create_display(title: str, stream_port: int = None, exit_keys=(27,), **server_options):
+    """
+    Window when stream_port is None, otherwise an MJPEG server on that port.
+    """
+    if stream_port is None:
+        return WindowDisplay(title, exit_keys)
+    return StreamDisplay(MJPEGServer(port=stream_port, **server_options))
@@ -0,0 +1,192 @@
+import logging
+import os
+import queue
+import threading
+import time
+
+import cv2
+
+from utils import metrics
+
+# Tells a worker thread to exit
+_STOP = object()
+
+
+class EventWriter:
+    """
+    Writes event images in background threads so the capture loop never
+    waits for JPEG encoding or the SD card.
+
+    - submit() is non-blocking by default: when the bounded queue is full
+      the image is dropped and counted; with block=True the caller waits
+      up to `timeout` (backpressure)
+    - files are fsynced in batches of `fsync_batch` (or every
+      `fsync_interval` seconds) instead of one by one, 0 disables fsync
+    - submitted images are owned by the writer, don't modify them afterwards
+    """
+
+    def __init__(
+        self,
+        workers: int = 2,
+        queue_size: int = 8,
+        jpeg_quality: int = 90,
+        fsync_batch: int = 10,
+        fsync_interval: float = 5.0
+    ):
+        self.workers = workers
+        self.jpeg_quality = jpeg_quality
+        self.fsync_batch = fsync_batch
+        self.fsync_interval = fsync_interval
+
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._threads = []
+
+        # Written but not yet fsynced files, guarded with the stats by _lock
+        self._pending = []
+        self._lock = threading.Lock()
+        self._last_sync = time.monotonic()
+
+        self._write_timer = metrics.stage_timer("write")
+        self._drop_counter = metrics.counter("frames_dropped_total", "Frames dropped between stages", stage="write")
+
+        self.stats = {
+            "submitted": 0,
+            "written": 0,
+            "dropped": 0,
+            "errors": 0,
+            "synced": 0,
+        }
+
+    def start(self):
+        for i in range(self.workers):
+            thread = threading.Thread(
+                target=self._worker,
+                name=f"event-writer-{i}",
+                daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self):
+        """
+        Write everything still queued, fsync and stop the workers.
+        """
+        for _ in self._threads:
+            self._queue.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+        self._sync()
+        logging.info(f"Event writer stats: {self.stats}")
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def _count(self, key, n=1):
+        with self._lock:
+            self.stats[key] += n
+
+    def submit(self, path, image, block: bool = False, timeout: float = None) -> bool:
+        """
+        Queue an image for writing. Returns False if it was dropped.
+        """
+        self._count("submitted")
+        try:
+            self._queue.put((str(path), image), block=block, timeout=timeout)
+            return True
+        except queue.Full:
+            self._count("dropped")
+            self._drop_counter.inc()
+            logging.warning(f"Event writer queue full, dropped: {path}")
+            return False
+
+    def _worker(self):
+        params = [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality]
+
+        while True:
+            try:
+                item = self._queue.get(timeout=self.fsync_interval or None)
+            except queue.Empty:
+                # Idle: make sure a partial batch does not wait forever
+                self._maybe_sync()
+                continue
+
+            if item is _STOP:
+                break
+
+            path, image = item
+            start = time.perf_counter()
+            try:
+                ok, encoded = cv2.imencode(".jpg", image, params)
+                if not ok:
+                    raise ValueError("JPEG encoding failed")
+
+                f = open(path, "wb")
+                try:
+                    f.write(encoded)
+                except OSError:
+                    # e.g. a full SD card: don't keep a truncated JPEG
+                    f.close()
+                    os.unlink(path)
+                    raise
+
+                if self.fsync_batch:
+                    f.flush()
+                    with self._lock:
+                        self._pending.append(f)
+                else:
+                    f.close()
+
+                self._count("written")
+                self._write_timer.observe(time.perf_counter() - start)
+            except (OSError, ValueError, cv2.error) as e:
+                self._count("errors")
+                logging.error(f"Can't write event image {path}: {e}")
+
+            self._maybe_sync()
+
+    def _maybe_sync(self):
+        with self._lock:
+            due = bool(self._pending) and (
+                len(self._pending) >= self.fsync_batch
+                or time.monotonic() - self._last_sync > self.fsync_interval
+            )
+        if due:
+            self._sync()
+
+    def _sync(self):
+        """
+        fsync and close all pending files, then their directories once.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, []
+            self._last_sync = time.monotonic()
+
+        directories = set()
+        for f in pending:
+            try:
+                os.fsync(f.fileno())
+                directories.add(os.path.dirname(f.name) or ".")
+            except OSError as e:
+                self._count("errors")
+                logging.error(f"fsync failed for {f.name}: {e}")
+            finally:
+                f.close()
+
+        for directory in directories:
+            try:
+                fd = os.open(directory, os.O_RDONLY)
+                try:
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+            except OSError as e:
+                self._count("errors")
+                logging.error(f"fsync failed for directory {directory}: {e}")
+
+        self._count("synced", len(pending))
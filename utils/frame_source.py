@@ -0,0 +1,373 @@
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp"}
+
+
+class EndOfStream(Exception):
+    """
+    Raised by capture_array()/read() when a finite source has no more frames.
+    """
+
+
+class DualStreamFrame:
+    """
+    One frame with a cheap analysis plane and a lazily fetched main image.
+
+    - analysis: (h, w) uint8 luma plane at lores resolution
+    - main(): full-resolution color frame, only fetched on first call
+    - release(): return camera buffers, the analysis view is invalid after it
+    """
+
+    def __init__(self, analysis, fetch_main, release=None, timestamp=None):
+        self.analysis = analysis
+        self.timestamp = timestamp
+        self._fetch_main = fetch_main
+        self._release = release
+        self._main = None
+
+    def main(self):
+        if self._main is None:
+            self._main = self._fetch_main()
+        return self._main
+
+    def release(self):
+        if self._release is not None:
+            self._release()
+            self._release = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+
+class FrameSource:
+    """
+    Common interface for everything that produces frames.
+
+    - capture_array() -> frame, same contract as Picamera2.capture_array()
+    - read() -> (frame, timestamp in seconds)
+    - capture_dual() -> DualStreamFrame with a lores luma plane for analysis
+
+    Finite sources raise EndOfStream when exhausted. With realtime=True file
+    and synthetic sources are paced to their nominal FPS, otherwise frames are
+    produced as fast as possible.
+    """
+
+    fps = None
+    realtime = False
+
+    # (w, h) of the analysis plane returned by capture_dual()
+    lores_size = None
+
+    def start(self):
+        self._started_at = time.monotonic()
+        self._frame_index = 0
+
+    def stop(self):
+        pass
+
+    def read(self):
+        raise NotImplementedError
+
+    def capture_array(self):
+        return self.read()[0]
+
+    def capture_dual(self):
+        """
+        Software stand-in for the camera's lores stream: the luma plane is
+        computed from the main frame so the dual-stream code paths can run
+        off-device.
+        """
+        frame, timestamp = self.read()
+
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        if self.lores_size and gray.shape[1::-1] != tuple(self.lores_size):
+            gray = cv2.resize(gray, self.lores_size, interpolation=cv2.INTER_LINEAR)
+
+        return DualStreamFrame(gray, lambda: frame, timestamp=timestamp)
+
+    def _pace(self):
+        """
+        Sleep until the next frame is due when replaying at nominal speed.
+        """
+        if self.realtime and self.fps:
+            due = self._started_at + self._frame_index / self.fps
+            delay = due - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        self._frame_index += 1
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+
+class PicameraSource(FrameSource):
+    """
+    Raspberry Pi camera via Picamera2, RGB888 main stream.
+    With lores_size set, a second YUV420 lores stream is configured and
+    capture_dual() exposes its Y plane without copying or converting.
+    """
+
+    def __init__(self, resolution=(640, 480), hflip=True, vflip=True, lores_size=None, camera_num=0):
+        self.resolution = resolution
+        self.hflip = hflip
+        self.vflip = vflip
+        self.lores_size = lores_size
+        self.camera_num = camera_num
+        self.camera = None
+
+    def start(self):
+        # Imported here so the other sources work on machines without libcamera
+        from picamera2 import Picamera2
+        from libcamera import Transform
+
+        self.camera = Picamera2(self.camera_num)
+
+        lores = None
+        if self.lores_size:
+            lores = {
+                "format": "YUV420",
+                "size": self.lores_size
+            }
+
+        config = self.camera.create_preview_configuration(
+            main={
+                "format": "RGB888",
+                "size": self.resolution
+            },
+            lores=lores,
+            # Extra buffers so frames held by a pipeline don't stall the camera
+            buffer_count=6 if lores else 4,
+            transform=Transform(
+                hflip=int(self.hflip),
+                vflip=int(self.vflip)
+            )
+        )
+
+        self.camera.configure(config)
+        self.camera.start()
+        super().start()
+
+    def stop(self):
+        if self.camera:
+            self.camera.stop()
+
+    def capture_array(self):
+        return self.camera.capture_array()
+
+    def read(self):
+        request = self.camera.capture_request()
+        try:
+            frame = request.make_array("main")
+            timestamp = request.get_metadata()["SensorTimestamp"] / 1e9
+        finally:
+            request.release()
+        return frame, timestamp
+
+    def capture_dual(self):
+        if not self.lores_size:
+            return super().capture_dual()
+
+        from picamera2 import MappedArray
+
+        request = self.camera.capture_request()
+        mapped = None
+
+        def release():
+            if mapped is not None:
+                mapped.__exit__(None, None, None)
+            request.release()
+
+        # Until DualStreamFrame owns release() a failure here would leak the
+        # request, and a few leaked buffers stall the camera
+        try:
+            lores = MappedArray(request, "lores")
+            lores.__enter__()
+            mapped = lores
+
+            # YUV420 buffer is (h * 3/2, stride), the Y plane is its top part
+            w, h = self.lores_size
+            y_plane = mapped.array[:h, :w]
+            timestamp = request.get_metadata()["SensorTimestamp"] / 1e9
+        except BaseException:
+            release()
+            raise
+
+        return DualStreamFrame(
+            y_plane,
+            lambda: request.make_array("main"),
+            release,
+            timestamp
+        )
+
+
+class VideoFileSource(FrameSource):
+    """
+    Frames decoded from a video file with OpenCV.
+    """
+
+    def __init__(self, path, resolution=None, realtime=False, loop=False):
+        self.path = str(path)
+        self.resolution = resolution
+        self.realtime = realtime
+        self.loop = loop
+        self.capture = None
+
+    def start(self):
+        self.capture = cv2.VideoCapture(self.path)
+        if not self.capture.isOpened():
+            raise OSError(f"Can't open video file: {self.path}")
+
+        self.fps = self.capture.get(cv2.CAP_PROP_FPS) or 30.0
+        super().start()
+
+    def stop(self):
+        if self.capture:
+            self.capture.release()
+
+    def read(self):
+        ok, frame = self.capture.read()
+
+        if not ok and self.loop:
+            self.capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ok, frame = self.capture.read()
+
+        if not ok:
+            raise EndOfStream(self.path)
+
+        timestamp = self.capture.get(cv2.CAP_PROP_POS_MSEC) / 1000
+        self._pace()
+
+        if self.resolution and frame.shape[1::-1] != tuple(self.resolution):
+            frame = cv2.resize(frame, self.resolution)
+
+        return frame, timestamp
+
+
+class ImageDirectorySource(FrameSource):
+    """
+    Frames from a directory of images, e.g. a collected dataset.
+    With preload=True images are decoded once up front so disk I/O does not
+    distort throughput measurements.
+    """
+
+    def __init__(self, path, resolution=None, fps=30.0, realtime=False, loop=False, preload=False):
+        self.files = sorted(
+            p for p in Path(path).iterdir()
+            if p.suffix.lower() in IMAGE_EXTENSIONS
+        )
+        if not self.files:
+            raise OSError(f"No images found in {path}")
+
+        self.resolution = resolution
+        self.fps = fps
+        self.realtime = realtime
+        self.loop = loop
+        self.preload = preload
+        self._cache = None
+
+    def _load(self, path):
+        frame = cv2.imread(str(path))
+        if self.resolution and frame.shape[1::-1] != tuple(self.resolution):
+            frame = cv2.resize(frame, self.resolution)
+        return frame
+
+    def start(self):
+        if self.preload:
+            self._cache = [self._load(p) for p in self.files]
+        super().start()
+
+    def read(self):
+        index = self._frame_index
+        if index >= len(self.files):
+            if not self.loop:
+                raise EndOfStream(str(self.files[0].parent))
+            index %= len(self.files)
+
+        if self._cache is not None:
+            frame = self._cache[index].copy()
+        else:
+            frame = self._load(self.files[index])
+
+        timestamp = self._frame_index / self.fps
+        self._pace()
+        return frame, timestamp
+
+
+class SyntheticSource(FrameSource):
+    """
+    Deterministic generated frames: a fixed noisy background with a few
+    moving rectangles. The same seed always yields the same sequence.
+    """
+
+    def __init__(self, resolution=(640, 480), fps=30.0, num_frames=None, objects=3, seed=0, realtime=False):
+        self.resolution = resolution
+        self.fps = fps
+        self.num_frames = num_frames
+        self.realtime = realtime
+
+        w, h = resolution
+        rng = np.random.default_rng(seed)
+        self.background = rng.integers(60, 120, (h, w, 3), dtype=np.uint8)
+
+        # Start position, velocity (px/frame), size and color per object
+        self.objects = [
+            (
+                rng.uniform(0, w), rng.uniform(0, h),
+                rng.uniform(-6, 6), rng.uniform(-4, 4),
+                int(rng.integers(40, 120)), int(rng.integers(40, 120)),
+                tuple(int(c) for c in rng.integers(0, 255, 3))
+            )
+            for _ in range(objects)
+        ]
+
+    def read(self):
+        if self.num_frames is not None and self._frame_index >= self.num_frames:
+            raise EndOfStream("synthetic")
+
+        w, h = self.resolution
+        i = self._frame_index
+        frame = self.background.copy()
+
+        for x, y, vx, vy, bw, bh, color in self.objects:
+            # Wrap around at the frame edges
+            px = int(x + vx * i) % max(w - bw, 1)
+            py = int(y + vy * i) % max(h - bh, 1)
+            frame[py:py + bh, px:px + bw] = color
+
+        timestamp = i / self.fps
+        self._pace()
+        return frame, timestamp
+
+
+def create_source(spec: str, resolution=(640, 480), realtime=False, loop=False):
+    """
+    Build a frame source from a short spec string:
+    - "picamera" or "picamera:<camera number>"
+    - "video:<path or stream URL>", anything cv2.VideoCapture opens
+    - "images:<dir>"
+    - "synthetic" or "synthetic:<num_frames>"
+    """
+    kind, _, arg = spec.partition(":")
+
+    if kind == "picamera":
+        return PicameraSource(resolution, camera_num=int(arg or 0))
+    if kind == "video":
+        return VideoFileSource(arg, resolution, realtime=realtime, loop=loop)
+    if kind == "images":
+        return ImageDirectorySource(arg, resolution, realtime=realtime, loop=loop)
+    if kind == "synthetic":
+        num_frames = int(arg) if arg else None
+        return SyntheticSource(resolution, num_frames=num_frames, realtime=realtime)
+
+    raise ValueError(f"Unknown frame source: {spec}")
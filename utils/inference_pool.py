@@ -0,0 +1,132 @@
+import multiprocessing
+import queue
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# Detector of this worker process, created once by _init_worker
+_detect = None
+
+
+def _init_worker(factory):
+    global _detect
+    _detect = factory()
+
+
+def _run(frame):
+    return _detect(frame)
+
+
+class ProcessPool:
+    """
+    Detector worker processes, one model instance per process so inference
+    runs outside the GIL of the capture/output process.
+
+    - factory: picklable module-level function returning detect(frame),
+      called once in every worker
+    - submit(frame) -> Future of detect(frame)
+
+    Workers are spawned rather than forked, forking a process that already
+    runs camera threads is unsafe.
+    """
+
+    def __init__(self, factory, workers: int = 2):
+        self.workers = workers
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(factory,)
+        )
+
+    def submit(self, frame):
+        return self._executor.submit(_run, frame)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.shutdown()
+
+
+# Shared memory block and its frame views, attached once per worker
+_shm = None
+_slots = None
+
+
+def _init_shm_worker(factory, shm_name, slot_count, slot_bytes):
+    global _shm, _slots
+    _init_worker(factory)
+
+    from multiprocessing import shared_memory
+
+    _shm = shared_memory.SharedMemory(name=shm_name)
+    _slots = [
+        _shm.buf[i * slot_bytes:(i + 1) * slot_bytes]
+        for i in range(slot_count)
+    ]
+
+
+def _run_slot(slot, shape, dtype):
+    frame = np.ndarray(shape, dtype=dtype, buffer=_slots[slot])
+    return _detect(frame)
+
+
+class SharedMemoryPool(ProcessPool):
+    """
+    ProcessPool that hands frames to the workers through a ring of
+    multiprocessing.shared_memory slots instead of pickling them: submit()
+    copies the frame into a free slot and only (slot, shape, dtype) crosses
+    the process boundary. Results come back pickled, so detectors should
+    return compact arrays, not images.
+
+    - slots: frames in flight at most, submit() waits for a free slot
+    - max_frame_shape: largest frame that will be submitted
+    - the detector must not keep a reference to the frame after returning,
+      the slot is reused for the next frame
+    """
+
+    def __init__(self, factory, workers: int = 2, slots: int = None, max_frame_shape=(480, 640, 3)):
+        from multiprocessing import shared_memory
+
+        self.workers = workers
+        self.slot_count = slots or 2 * workers
+        self.slot_bytes = int(np.prod(max_frame_shape))
+
+        self._shm = shared_memory.SharedMemory(create=True, size=self.slot_count * self.slot_bytes)
+        self._free = queue.Queue()
+        for slot in range(self.slot_count):
+            self._free.put(slot)
+
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_shm_worker,
+            initargs=(factory, self._shm.name, self.slot_count, self.slot_bytes)
+        )
+
+    def submit(self, frame):
+        if frame.nbytes > self.slot_bytes:
+            raise ValueError(f"Frame of {frame.shape} does not fit a {self.slot_bytes} byte slot")
+
+        slot = self._free.get()
+        try:
+            view = np.ndarray(frame.shape, dtype=frame.dtype, buffer=self._shm.buf, offset=slot * self.slot_bytes)
+            np.copyto(view, frame)
+
+            future = self._executor.submit(_run_slot, slot, frame.shape, frame.dtype.str)
+        except BaseException:
+            # A broken or shut down pool must not keep the slot
+            self._free.put(slot)
+            raise
+
+        future.add_done_callback(lambda _: self._free.put(slot))
+        return future
+
+    def shutdown(self):
+        super().shutdown()
+        self._shm.close()
+        self._shm.unlink()
@@ -0,0 +1,299 @@
+import bisect
+import logging
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+# Latency buckets in seconds, from 1 ms camera reads to multi-second stalls
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in sorted(labels.items())) + "}"
+
+
+class Counter:
+    """
+    Monotonic count, e.g. frames or drops.
+    """
+
+    kind = "counter"
+
+    def __init__(self, name: str, labels: dict):
+        self.name = name
+        self.labels = labels
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: int = 1):
+        with self._lock:
+            self.value += amount
+
+    def samples(self):
+        yield self.name, self.labels, self.value
+
+
+class Gauge:
+    """
+    Value that goes up and down, e.g. queue depth or FPS.
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name: str, labels: dict):
+        self.name = name
+        self.labels = labels
+        self.value = 0.0
+
+    def set(self, value: float):
+        self.value = value
+
+    def samples(self):
+        yield self.name, self.labels, self.value
+
+
+class _Timer:
+    __slots__ = ("histogram", "start")
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.histogram.observe(time.perf_counter() - self.start)
+
+
+class Histogram:
+    """
+    Distribution of observed values (seconds for timers).
+
+    Cumulative bucket counts are exported for Prometheus; the last `window`
+    observations are kept for the p50/p95/p99 of the summary log.
+    observe() is a bisect and a few additions, cheap enough per frame.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, labels: dict, buckets=DEFAULT_BUCKETS, window: int = 1000):
+        self.name = name
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.recent = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.count += 1
+            self.sum += value
+        self.recent.append(value)
+
+    def time(self):
+        """
+        with histogram.time(): ... observes the block's duration.
+        """
+        return _Timer(self)
+
+    def summary(self):
+        recent = np.array(self.recent) * 1000 if self.recent else np.zeros(1)
+        p50, p95, p99 = np.percentile(recent, (50, 95, 99))
+        return {
+            "count": self.count,
+            "mean_ms": round(self.sum / self.count * 1000, 2) if self.count else 0.0,
+            "p50_ms": round(float(p50), 2),
+            "p95_ms": round(float(p95), 2),
+            "p99_ms": round(float(p99), 2),
+        }
+
+    def samples(self):
+        with self._lock:
+            counts = list(self.counts)
+            count, total = self.count, self.sum
+
+        cumulative = 0
+        for bound, n in zip(self.buckets + (float("inf"),), counts):
+            cumulative += n
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            yield f"{self.name}_bucket", {**self.labels, "le": le}, cumulative
+        yield f"{self.name}_sum", self.labels, total
+        yield f"{self.name}_count", self.labels, count
+
+
+class Registry:
+    """
+    Metrics by name and labels. Asking twice for the same name and labels
+    returns the same object, so modules can look metrics up where they use
+    them instead of passing them around.
+    """
+
+    def __init__(self):
+        self._metrics = {}
+        self._help = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name, help, labels, **options):
+        key = (name, tuple(sorted(labels.items())))
+        metric = self._metrics.get(key)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.get(key)
+                if metric is None:
+                    metric = cls(name, labels, **options)
+                    self._metrics[key] = metric
+                    self._help.setdefault(name, (cls.kind, help))
+
+        if not isinstance(metric, cls):
+            raise ValueError(f"Metric {name} is already a {metric.kind}")
+        return metric
+
+    def counter(self, name: str, help: str = "", **labels) -> Counter:
+        return self._get(Counter, name, help, labels)
+
+    def gauge(self, name: str, help: str = "", **labels) -> Gauge:
+        return self._get(Gauge, name, help, labels)
+
+    def histogram(self, name: str, help: str = "", buckets=DEFAULT_BUCKETS, **labels) -> Histogram:
+        return self._get(Histogram, name, help, labels, buckets=buckets)
+
+    def render(self) -> str:
+        """
+        Prometheus text exposition format.
+        """
+        with self._lock:
+            metrics = sorted(self._metrics.items())
+
+        lines = []
+        seen = set()
+        for (name, _), metric in metrics:
+            if name not in seen:
+                kind, help = self._help[name]
+                if help:
+                    lines.append(f"# HELP {name} {help}")
+                lines.append(f"# TYPE {name} {kind}")
+                seen.add(name)
+            for sample, labels, value in metric.samples():
+                lines.append(f"{sample}{_format_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self):
+        """
+        {name{labels}: value or histogram summary}, for logging.
+        """
+        with self._lock:
+            metrics = sorted(self._metrics.items())
+
+        return {
+            f"{metric.name}{_format_labels(metric.labels)}":
+                metric.summary() if isinstance(metric, Histogram) else metric.value
+            for _, metric in metrics
+        }
+
+    def log_summary(self):
+        for name, value in self.summary().items():
+            if isinstance(value, dict):
+                logging.info(
+                    f"[{name}] n={value['count']} mean={value['mean_ms']}ms "
+                    f"p50={value['p50_ms']}ms p95={value['p95_ms']}ms p99={value['p99_ms']}ms"
+                )
+            else:
+                logging.info(f"[{name}] {value}")
+
+
+# Process-wide registry used by the pipelines
+REGISTRY = Registry()
+
+counter = REGISTRY.counter
+gauge = REGISTRY.gauge
+histogram = REGISTRY.histogram
+
+
+def stage_timer(stage: str, **labels) -> Histogram:
+    """
+    Latency histogram of one hot-path stage: capture, preprocess,
+    inference, postprocess, draw, write, ...
+    """
+    return histogram("stage_seconds", "Time spent per frame in a pipeline stage", stage=stage, **labels)
+
+
+class FrameRate:
+    """
+    Frames per second over the last `window` frames, also exported as the
+    frames_per_second gauge. Call tick() once per frame.
+    """
+
+    def __init__(self, name: str, window: int = 30):
+        self.times = deque(maxlen=window)
+        self.gauge = gauge("frames_per_second", "Recent output frame rate", source=name)
+
+    def tick(self) -> float:
+        self.times.append(time.perf_counter())
+        if len(self.times) < 2:
+            return 0.0
+
+        fps = (len(self.times) - 1) / (self.times[-1] - self.times[0])
+        self.gauge.set(fps)
+        return fps
+
+
+def http_handler(registry: Registry = REGISTRY):
+    return lambda: (CONTENT_TYPE, registry.render().encode())
+
+
+def serve(port: int = 9100, server=None):
+    """
+    Expose the registry at /metrics: on an already running MJPEGServer,
+    or on a new one listening on `port`.
+    """
+    if server is None:
+        from utils.mjpeg_server import MJPEGServer
+        server = MJPEGServer(port=port).start()
+
+    server.add_route("/metrics", http_handler())
+    return server
+
+
+class Reporter:
+    """
+    Logs the registry summary every `interval` seconds from a daemon thread.
+    """
+
+    def __init__(self, interval: float = 30.0, registry: Registry = REGISTRY):
+        self.interval = interval
+        self.registry = registry
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="metrics-reporter", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=2)
+            self._thread = None
+        self.registry.log_summary()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.registry.log_summary()
@@ -0,0 +1,257 @@
+import asyncio
+import logging
+import threading
+
+import cv2
+
+from utils import metrics
+
+BOUNDARY = "frame"
+
+# Stream served at /stream when no name is given
+DEFAULT_STREAM = "main"
+
+
+class _Channel:
+    """
+    Latest encoded frame of one named stream and the clients waiting on it.
+    Only touched from the event loop thread.
+    """
+
+    def __init__(self):
+        self.jpeg = None
+        self.seq = 0
+        self.waiters = set()
+
+
+class MJPEGServer:
+    """
+    Serves annotated frames as multipart MJPEG over HTTP, for Pis running
+    without a desktop session.
+
+    - publish(frame, name) is called from the pipeline; it returns at once
+      when nobody watches that stream, otherwise the frame is JPEG-encoded
+      once and the same bytes go to every client
+    - each client only ever gets the newest frame: while a slow client is
+      still sending, newer frames replace the pending one and the skipped
+      ones are counted as drops, the pipeline never waits for the network
+    - GET / lists the streams, /stream/<name> (or /stream) is the MJPEG
+      stream; add_route() serves extra text endpoints
+
+    The asyncio loop runs in a daemon thread started by start().
+    """
+
+    def __init__(self, host: str = "0.0.0.0", port: int = 8080, quality: int = 80):
+        self.host = host
+        self.port = port
+        self.quality = quality
+
+        self._channels = {}
+        self._routes = {}
+        self._tasks = set()
+
+        self._loop = None
+        self._thread = None
+        self._stopping = None
+        self._started = threading.Event()
+        self._error = None
+
+        self._encode_timer = metrics.stage_timer("stream_encode")
+
+        self.stats = {
+            "published": 0,
+            "skipped": 0,
+            "sent": 0,
+            "dropped": 0,
+            "clients": 0,
+        }
+
+    def add_route(self, path, handler):
+        """
+        Serve handler() -> (content_type, body bytes) at `path`.
+        The handler runs on the server thread and should be quick.
+        """
+        self._routes[path] = handler
+
+    def start(self):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name="mjpeg-server", daemon=True)
+        self._thread.start()
+        self._started.wait()
+
+        if self._error is not None:
+            raise self._error
+
+        logging.info(f"MJPEG server on http://{self.host}:{self.port}/")
+        return self
+
+    def stop(self):
+        if self._thread is None:
+            return
+
+        self._loop.call_soon_threadsafe(self._stopping.set)
+        self._thread.join(timeout=5)
+        self._thread = None
+        logging.info(f"MJPEG server stats: {self.stats}")
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def has_clients(self, name: str = DEFAULT_STREAM) -> bool:
+        channel = self._channel(name)
+        return channel is not None and bool(channel.waiters)
+
+    def _channel(self, name):
+        channel = self._channels.get(name)
+        if channel is None:
+            # Registered on the loop thread so the index page lists it
+            self._loop.call_soon_threadsafe(self._channels.setdefault, name, _Channel())
+        return channel
+
+    def publish(self, frame, name: str = DEFAULT_STREAM) -> bool:
+        """
+        Send a BGR frame to the viewers of stream `name`.
+        Returns False when nobody is watching and nothing was encoded.
+        """
+        channel = self._channel(name)
+        if channel is None or not channel.waiters:
+            self.stats["skipped"] += 1
+            return False
+
+        with self._encode_timer.time():
+            ok, buffer = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+        if not ok:
+            return False
+
+        self.stats["published"] += 1
+        self._loop.call_soon_threadsafe(self._deliver, channel, buffer.tobytes())
+        return True
+
+    def _deliver(self, channel, jpeg):
+        channel.jpeg = jpeg
+        channel.seq += 1
+        for event in channel.waiters:
+            event.set()
+
+    def _run(self):
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._loop.run_until_complete(self._serve())
+        except Exception as e:
+            self._error = e
+            self._started.set()
+        finally:
+            self._loop.close()
+
+    async def _serve(self):
+        self._stopping = asyncio.Event()
+        server = await asyncio.start_server(self._handle, self.host, self.port)
+        self._started.set()
+
+        await self._stopping.wait()
+
+        server.close()
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        await server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        task = asyncio.current_task()
+        self._tasks.add(task)
+        try:
+            request = await asyncio.wait_for(reader.readline(), timeout=10)
+            # Headers are not needed, read up to the blank line
+            while (await asyncio.wait_for(reader.readline(), timeout=10)).strip():
+                pass
+
+            method, path, _ = request.decode("latin-1").split(" ", 2)
+            path = path.split("?", 1)[0]
+
+            if method != "GET":
+                await self._respond(writer, "405 Method Not Allowed", "text/plain", b"GET only\n")
+            elif path == "/":
+                await self._respond(writer, "200 OK", "text/html", self._index())
+            elif path == "/stream" or path.startswith("/stream/"):
+                name = path[len("/stream/"):] or DEFAULT_STREAM
+                await self._stream(writer, name)
+            elif path in self._routes:
+                content_type, body = self._routes[path]()
+                await self._respond(writer, "200 OK", content_type, body)
+            else:
+                await self._respond(writer, "404 Not Found", "text/plain", b"Not found\n")
+        except (ConnectionError, asyncio.TimeoutError, ValueError):
+            pass
+        except asyncio.CancelledError:
+            # Server shutting down
+            pass
+        finally:
+            self._tasks.discard(task)
+            writer.close()
+
+    async def _respond(self, writer, status, content_type, body):
+        writer.write(
+            f"HTTP/1.1 {status}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Connection: close\r\n\r\n".encode("latin-1") + body
+        )
+        await writer.drain()
+
+    def _count_drops(self, n):
+        if n > 0:
+            self.stats["dropped"] += n
+            metrics.counter("frames_dropped_total", "Frames dropped between stages", stage="stream").inc(n)
+
+    def _index(self):
+        links = "".join(
+            f'<h3>{name}</h3><img src="/stream/{name}">'
+            for name in sorted(self._channels)
+        )
+        return f"<html><body>{links or 'No streams yet'}</body></html>".encode()
+
+    async def _stream(self, writer, name):
+        channel = self._channels.setdefault(name, _Channel())
+        event = asyncio.Event()
+
+        # drain() returns only once the socket took everything, so at most
+        # one frame per client is buffered in this process
+        writer.transport.set_write_buffer_limits(high=0)
+        writer.write(
+            "HTTP/1.1 200 OK\r\n"
+            f"Content-Type: multipart/x-mixed-replace; boundary={BOUNDARY}\r\n"
+            "Cache-Control: no-cache\r\n"
+            "Connection: close\r\n\r\n".encode("latin-1")
+        )
+        await writer.drain()
+
+        peer = writer.get_extra_info("peername")
+        logging.info(f"MJPEG client {peer} connected to '{name}'")
+        self.stats["clients"] += 1
+        channel.waiters.add(event)
+        last_seq = channel.seq
+
+        try:
+            while True:
+                await event.wait()
+                event.clear()
+
+                # Frames published while the last one was being sent
+                self._count_drops(channel.seq - last_seq - 1)
+                last_seq = channel.seq
+
+                jpeg = channel.jpeg
+                writer.write(
+                    f"--{BOUNDARY}\r\n"
+                    "Content-Type: image/jpeg\r\n"
+                    f"Content-Length: {len(jpeg)}\r\n\r\n".encode("latin-1") + jpeg + b"\r\n"
+                )
+                await writer.drain()
+                self.stats["sent"] += 1
+        finally:
+            channel.waiters.discard(event)
+            self._count_drops(channel.seq - last_seq)
+            logging.info(f"MJPEG client {peer} disconnected from '{name}'")
@@ -0,0 +1,272 @@
+import logging
+import queue
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+from utils import metrics
+from utils.frame_source import EndOfStream
+
+# Drop policies for the queues between stages
+LATEST = "latest"  # newest frame wins: a full queue discards its oldest item
+BLOCK = "block"    # producer waits until the consumer catches up
+
+# Marker passed down the queues when a finite source is exhausted
+_END = object()
+
+
+def _release(item):
+    """
+    Release the frame of a queue item if it holds camera buffers.
+    """
+    if isinstance(item, tuple):
+        release = getattr(item[0], "release", None)
+        if release is not None:
+            release()
+
+
+class StageStats:
+    """
+    Latency and drop accounting for one pipeline stage.
+    Written by a single thread, read by the output thread for reporting.
+    With `histogram` / `drop_counter` from utils.metrics the same numbers
+    are also exported at /metrics.
+    """
+
+    def __init__(self, name: str, window: int = 1000, histogram=None, drop_counter=None):
+        self.name = name
+        self.count = 0
+        self.drops = 0
+        self.total = 0.0
+        self.samples = deque(maxlen=window)
+        self.histogram = histogram
+        self.drop_counter = drop_counter
+
+    def add(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        self.samples.append(seconds)
+        if self.histogram is not None:
+            self.histogram.observe(seconds)
+
+    def drop(self):
+        self.drops += 1
+        if self.drop_counter is not None:
+            self.drop_counter.inc()
+
+    def summary(self):
+        samples = np.array(self.samples) * 1000 if self.samples else np.zeros(1)
+        return {
+            "count": self.count,
+            "drops": self.drops,
+            "mean_ms": round(self.total / self.count * 1000, 2) if self.count else 0.0,
+            "p50_ms": round(float(np.percentile(samples, 50)), 2),
+            "p95_ms": round(float(np.percentile(samples, 95)), 2),
+            "max_ms": round(float(samples.max()), 2),
+        }
+
+
+class Pipeline:
+    """
+    Capture -> process -> output pipeline running each stage in its own thread.
+
+    - source: object with capture_array()
+    - process(frame) -> result, e.g. detector inference
+    - output(frame, result) -> bool, return False to stop
+
+    With dual_stream=True frames are DualStreamFrame objects from
+    source.capture_dual(); the pipeline releases them once output is done
+    or when they are dropped, so camera buffers are returned promptly.
+
+    Capture and process run in background threads. The output stage runs in
+    the thread that calls run(), so OpenCV GUI calls stay on the main thread.
+    Stages are connected by bounded queues; with the "latest" drop policy a
+    slow stage always receives the newest frame and stale ones are counted
+    as drops instead of building up latency.
+    """
+
+    def __init__(
+        self,
+        source,
+        process,
+        output,
+        queue_size: int = 1,
+        drop_policy: str = LATEST,
+        stats_interval: float = 10.0,
+        dual_stream: bool = False
+    ):
+        if drop_policy not in (LATEST, BLOCK):
+            raise ValueError(f"Unknown drop policy: {drop_policy}")
+
+        self.source = source
+        self.process = process
+        self.output = output
+        self.drop_policy = drop_policy
+        self.stats_interval = stats_interval
+        self._capture = source.capture_dual if dual_stream else source.capture_array
+
+        self._frames = queue.Queue(maxsize=queue_size)
+        self._results = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+        self._error = None
+        self._threads = []
+
+        self.stats = {
+            name: StageStats(
+                name,
+                histogram=metrics.stage_timer(name),
+                drop_counter=metrics.counter("frames_dropped_total", "Frames dropped between stages", stage=name)
+            )
+            for name in ("capture", "process", "output")
+        }
+        self.stats["latency"] = StageStats(
+            "latency",
+            histogram=metrics.histogram("frame_latency_seconds", "Capture to end of output")
+        )
+
+    def _put(self, q, item, stats, block=False):
+        if self.drop_policy == LATEST and not block:
+            while True:
+                try:
+                    q.put_nowait(item)
+                    return
+                except queue.Full:
+                    try:
+                        _release(q.get_nowait())
+                        stats.drop()
+                    except queue.Empty:
+                        pass
+
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+        # Stopped before the queue took it, nobody else will release it
+        _release(item)
+
+    def _get(self, q):
+        while not self._stop.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return None
+
+    def _run_stage(self, body):
+        try:
+            while not self._stop.is_set():
+                if body() is False:
+                    break
+        except Exception as e:
+            self._error = e
+            self._stop.set()
+
+    def _capture_step(self):
+        start = time.perf_counter()
+        try:
+            frame = self._capture()
+        except EndOfStream:
+            self._put(self._frames, _END, self.stats["capture"], block=True)
+            return False
+        self.stats["capture"].add(time.perf_counter() - start)
+
+        self._put(self._frames, (frame, start), self.stats["capture"])
+
+    def _process_step(self):
+        item = self._get(self._frames)
+        if item is None:
+            return
+        if item is _END:
+            self._put(self._results, _END, self.stats["process"], block=True)
+            return False
+
+        frame, captured_at = item
+        start = time.perf_counter()
+        result = self.process(frame)
+        self.stats["process"].add(time.perf_counter() - start)
+
+        self._put(self._results, (frame, result, captured_at), self.stats["process"])
+
+    def start(self):
+        for name, step in (
+            ("capture", self._capture_step),
+            ("process", self._process_step),
+        ):
+            thread = threading.Thread(
+                target=self._run_stage,
+                args=(step,),
+                name=f"pipeline-{name}",
+                daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout=2)
+        self._threads = []
+
+        # Return buffers of frames still waiting in the queues
+        for q in (self._frames, self._results):
+            while True:
+                try:
+                    _release(q.get_nowait())
+                except queue.Empty:
+                    break
+
+    def run(self):
+        """
+        Start the background stages and run the output stage on the calling
+        thread until output returns False, the source ends, a stage fails
+        or Ctrl+C.
+        """
+        self.start()
+        last_report = time.monotonic()
+
+        try:
+            while not self._stop.is_set():
+                item = self._get(self._results)
+                if item is None or item is _END:
+                    break
+
+                frame, result, captured_at = item
+                start = time.perf_counter()
+                try:
+                    keep_running = self.output(frame, result)
+                finally:
+                    _release(item)
+                end = time.perf_counter()
+
+                self.stats["output"].add(end - start)
+                self.stats["latency"].add(end - captured_at)
+
+                if keep_running is False:
+                    break
+
+                if self.stats_interval and time.monotonic() - last_report > self.stats_interval:
+                    self.log_stats()
+                    last_report = time.monotonic()
+        except KeyboardInterrupt:
+            logging.info("Pipeline interrupted")
+        finally:
+            self.stop()
+            self.log_stats()
+
+        if self._error is not None:
+            raise self._error
+
+    def summary(self):
+        return {name: stats.summary() for name, stats in self.stats.items()}
+
+    def log_stats(self):
+        for name, s in self.summary().items():
+            logging.info(
+                f"[{name}] frames={s['count']} drops={s['drops']} "
+                f"mean={s['mean_ms']}ms p95={s['p95_ms']}ms max={s['max_ms']}ms"
+            )
@@ -0,0 +1,197 @@
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, wait
+
+from utils import metrics
+from utils.frame_source import EndOfStream
+from utils.pipeline import StageStats
+
+
+class Stream:
+    """
+    One frame source with its own capture thread and a small queue of
+    frames waiting for a worker. When the queue is full the oldest frame
+    is dropped, so a busy pool never delays a stream by more than
+    `queue_size` frames.
+    """
+
+    def __init__(self, name, source, queue_size: int = 2):
+        self.name = name
+        self.source = source
+        self.frames = deque()
+        self.queue_size = queue_size
+        self.ended = False
+        self.in_flight = 0
+
+        self.captured = 0
+        self.dropped = 0
+        self.processed = 0
+        self.latency = StageStats(
+            name,
+            histogram=metrics.histogram("frame_latency_seconds", "Capture to end of output", stream=name)
+        )
+        self.drop_counter = metrics.counter("frames_dropped_total", "Frames dropped between stages", stream=name)
+
+        # Counters at the last stats report, for per-interval FPS
+        self._last_processed = 0
+
+    def put(self, frame, captured_at, lock):
+        with lock:
+            if len(self.frames) >= self.queue_size:
+                self.frames.popleft()
+                self.dropped += 1
+                self.drop_counter.inc()
+            self.frames.append((frame, captured_at))
+            self.captured += 1
+
+
+class Supervisor:
+    """
+    Runs several frame sources against one shared pool of detector workers.
+
+    - every stream is captured in its own thread
+    - the scheduler hands frames to the pool round-robin across streams
+      that have a frame waiting, so a fast source can't starve a slow one;
+      at most `in_flight` frames are queued in the pool at a time
+    - output(name, frame, result) runs in the thread calling run(),
+      return False to stop
+    - per-stream FPS, queue depth, drops and capture-to-result latency
+      are logged every `stats_interval` seconds
+    """
+
+    def __init__(self, sources: dict, pool, output, queue_size: int = 2, in_flight: int = None, stats_interval: float = 10.0):
+        self.streams = [Stream(name, source, queue_size) for name, source in sources.items()]
+        self.pool = pool
+        self.output = output
+        self.in_flight = in_flight or 2 * pool.workers
+        self.stats_interval = stats_interval
+
+        self._lock = threading.Lock()
+        self._frame_ready = threading.Event()
+        self._stop = threading.Event()
+        self._threads = []
+        self._next = 0
+
+    def _capture(self, stream):
+        try:
+            while not self._stop.is_set():
+                try:
+                    frame = stream.source.capture_array()
+                except EndOfStream:
+                    break
+                stream.put(frame, time.perf_counter(), self._lock)
+                self._frame_ready.set()
+        except Exception as e:
+            logging.error(f"Stream {stream.name} failed: {e}")
+        finally:
+            stream.ended = True
+            self._frame_ready.set()
+
+    def _next_frame(self):
+        """
+        Round-robin over the streams, returns (stream, frame, captured_at)
+        or None when nothing is waiting.
+        """
+        with self._lock:
+            for i in range(len(self.streams)):
+                stream = self.streams[(self._next + i) % len(self.streams)]
+                if stream.frames:
+                    self._next = (self._next + i + 1) % len(self.streams)
+                    frame, captured_at = stream.frames.popleft()
+                    return stream, frame, captured_at
+        return None
+
+    def start(self):
+        for stream in self.streams:
+            stream.source.start()
+            thread = threading.Thread(
+                target=self._capture,
+                args=(stream,),
+                name=f"capture-{stream.name}",
+                daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout=2)
+        self._threads = []
+
+        for stream in self.streams:
+            stream.source.stop()
+
+    def run(self):
+        self.start()
+        pending = {}
+        started = last_report = time.monotonic()
+
+        try:
+            while True:
+                # Fill the pool up to the in-flight limit
+                while len(pending) < self.in_flight:
+                    item = self._next_frame()
+                    if item is None:
+                        break
+                    stream, frame, captured_at = item
+                    stream.in_flight += 1
+                    pending[self.pool.submit(frame)] = item
+
+                if not pending:
+                    if all(s.ended and not s.frames for s in self.streams):
+                        break
+                    self._frame_ready.wait(0.05)
+                    self._frame_ready.clear()
+                    continue
+
+                done, _ = wait(pending, timeout=0.05, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    stream, frame, captured_at = pending.pop(future)
+                    stream.in_flight -= 1
+                    result = future.result()
+
+                    stream.processed += 1
+                    stream.latency.add(time.perf_counter() - captured_at)
+
+                    if self.output(stream.name, frame, result) is False:
+                        return
+
+                now = time.monotonic()
+                if self.stats_interval and now - last_report >= self.stats_interval:
+                    self.log_stats(now - last_report)
+                    last_report = now
+        finally:
+            self.stop()
+            for future in pending:
+                future.cancel()
+            self.log_stats(time.monotonic() - started, total=True)
+
+    def summary(self, interval: float = None, total: bool = False):
+        """
+        Per-stream stats; FPS is over the last interval unless total=True.
+        """
+        report = {}
+        for stream in self.streams:
+            processed = stream.processed if total else stream.processed - stream._last_processed
+            stream._last_processed = stream.processed
+
+            latency = stream.latency.summary()
+            report[stream.name] = {
+                "fps": round(processed / interval, 1) if interval else 0.0,
+                "captured": stream.captured,
+                "processed": stream.processed,
+                "dropped": stream.dropped,
+                "queue_depth": len(stream.frames),
+                "in_flight": stream.in_flight,
+                "latency_p50_ms": latency["p50_ms"],
+                "latency_p95_ms": latency["p95_ms"],
+            }
+        return report
+
+    def log_stats(self, interval: float, total: bool = False):
+        for name, stats in self.summary(interval, total).items():
+            logging.info(f"Stream {name}: {stats}")